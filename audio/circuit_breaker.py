@@ -0,0 +1,160 @@
+"""
+Extraction circuit breaker for Music Bot
+Stops hammering YouTube once it starts rate-limiting, backing off exponentially between probes
+"""
+import asyncio
+import time
+from typing import Dict
+from utils.logger import logger
+
+# Failure classes
+RATE_LIMITED = 'rate_limited'
+UNAVAILABLE = 'unavailable'  # Deleted, removed, terminated account
+PRIVATE = 'private'
+REGION_BLOCKED = 'region_blocked'
+AGE_RESTRICTED = 'age_restricted'
+NOT_FOUND = 'not_found'  # Nothing playable came back
+TRANSIENT = 'transient'  # Timeouts, connection resets, 5xx
+UNKNOWN = 'unknown'
+
+# Breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Checked in order - "Sign in to confirm you're not a bot" must win over the age check
+_PATTERNS = (
+    (RATE_LIMITED, ('http error 429', 'too many requests', 'not a bot', 'rate limit', 'rate-limit')),
+    (PRIVATE, ('private video', 'video is private')),
+    (REGION_BLOCKED, ('in your country', 'geo restrict', 'geo-restrict', 'not available in your region')),
+    (AGE_RESTRICTED, ('confirm your age', 'age-restricted', 'age restricted', 'inappropriate for some users')),
+    (UNAVAILABLE, ('video unavailable', 'has been removed', 'no longer available', 'been terminated',
+                   'does not exist', 'video is not available', 'members-only', 'join this channel')),
+    (TRANSIENT, ('timed out', 'timeout', 'connection', 'http error 5', 'temporarily')),
+)
+
+
+def classify_error(error: BaseException) -> str:
+    """Sort an extraction error into one of the failure classes"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return TRANSIENT
+
+    # yt-dlp reports everything as DownloadError, so the message is all we have
+    message = str(error).lower().replace('’', "'")
+    for failure_class, needles in _PATTERNS:
+        if any(needle in message for needle in needles):
+            return failure_class
+    return UNKNOWN
+
+
+class CircuitOpenError(Exception):
+    """Extraction is paused after rate limiting"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Extraction paused for {retry_after:.0f}s after rate limiting")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Shared breaker around every yt-dlp call
+
+    ``threshold`` rate-limit failures in a row open the circuit: calls fail
+    fast with CircuitOpenError for the backoff period. After that a single
+    call is let through as a probe (half-open). If it is rate-limited again
+    the circuit re-opens with twice the backoff, up to ``max_backoff``;
+    anything else - success or an ordinary per-video error - closes it.
+    Only rate limiting trips the breaker; a deleted video says nothing
+    about whether YouTube is accepting requests.
+    """
+
+    def __init__(self, threshold: int, base_backoff: float, max_backoff: float):
+        self.threshold = max(1, threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.consecutive = 0
+        self.backoff = base_backoff
+        self._opened_until = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+        self.failures: Dict[str, int] = {}
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 when closed)"""
+        if self.state == CLOSED:
+            return 0.0
+        return max(1.0, self._opened_until - time.monotonic())
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError unless a call may go out now; returns whether this call is the half-open probe"""
+        if self.state == CLOSED:
+            return False
+
+        if self.state == OPEN and time.monotonic() >= self._opened_until:
+            self.state = HALF_OPEN
+            logger.info("Extraction circuit half-open, probing")
+
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        self.rejected += 1
+        raise CircuitOpenError(self.retry_after)
+
+    def record_success(self):
+        """The call reached YouTube and got an answer"""
+        self._probing = False
+        self.consecutive = 0
+        if self.state != CLOSED:
+            logger.info("Extraction circuit closed")
+            self.state = CLOSED
+            self.backoff = self.base_backoff
+
+    def record_failure(self, error: BaseException, probe: bool = False) -> str:
+        """Count a failed call (``probe`` if before_call made it the probe); returns its failure class"""
+        failure_class = classify_error(error)
+        self.failures[failure_class] = self.failures.get(failure_class, 0) + 1
+
+        if failure_class != RATE_LIMITED:
+            # YouTube answered, just not with something playable
+            if failure_class != TRANSIENT:
+                self.record_success()
+            elif probe:
+                self.release_probe()
+            return failure_class
+
+        self._probing = False
+        self.consecutive += 1
+        if self.state == HALF_OPEN:
+            self.backoff = min(self.max_backoff, self.backoff * 2)
+            self._open()
+        elif self.state == CLOSED and self.consecutive >= self.threshold:
+            self._open()
+        return failure_class
+
+    def release_probe(self):
+        """The probe was abandoned (cancelled, timed out) - let the next call probe instead
+
+        Only the call that before_call() made the probe may release it;
+        other calls finishing meanwhile must not let a second probe out.
+        """
+        self._probing = False
+
+    def _open(self):
+        self.state = OPEN
+        self.trips += 1
+        self._opened_until = time.monotonic() + self.backoff
+        logger.warning(f"Extraction rate-limited, pausing for {self.backoff:.0f}s")
+
+    def stats(self) -> Dict[str, object]:
+        """Breaker state and failure counts by class"""
+        return {
+            'state': self.state,
+            'retry_after': round(self.retry_after, 1),
+            'backoff': self.backoff,
+            'trips': self.trips,
+            'rejected': self.rejected,
+            **{f'failed_{name}': count for name, count in sorted(self.failures.items())},
+        }
@@ -0,0 +1,163 @@
+"""
+Gapless and crossfade playback for Music Bot
+One long-lived AudioSource per guild that splices (or mixes) consecutive tracks in the audio thread
+"""
+import threading
+from typing import Callable, Optional
+import discord
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - without it tracks are spliced without a fade
+    np = None
+
+FRAME_SIZE = 3840  # 20 ms of 48 kHz stereo int16
+FRAMES_PER_SECOND = 50
+
+
+def _mix(outgoing: bytes, incoming: bytes, start: float, end: float) -> bytes:
+    """Mix two PCM frames, fading the incoming one from `start` to `end` across the frame"""
+    a = np.frombuffer(outgoing, dtype=np.int16).reshape(-1, 2).astype(np.float32)
+    b = np.frombuffer(incoming, dtype=np.int16).reshape(-1, 2).astype(np.float32)
+    fade = np.linspace(start, end, len(a), endpoint=False, dtype=np.float32)[:, None]
+    mixed = a * (1.0 - fade) + b * fade
+    np.clip(mixed, -32768, 32767, out=mixed)
+    return mixed.astype(np.int16).tobytes()
+
+
+class CrossfadeSource(discord.AudioSource):
+    """PCM source that keeps playing across track boundaries
+
+    The next track is offered from the event loop (see Prewarmer) as a raw
+    PCM source. When the current track ends the next one starts on the very
+    next frame; with a crossfade configured, the two overlap for the last
+    ``fade_ms`` of the current track instead. ``on_advance`` is called from
+    the audio thread with the song that took over.
+    """
+
+    def __init__(self, song, source: discord.AudioSource, fade_ms: int,
+                 on_advance: Optional[Callable] = None):
+        self.fade_frames = fade_ms // 20 if np is not None else 0
+        self.on_advance = on_advance
+        self._lock = threading.Lock()
+        self._song = song
+        self._source = source
+        self._frames_read = 0
+        self._next = None  # (song, source)
+        self._fading = False
+        self.active = True
+
+    @property
+    def song(self):
+        """Song whose audio is currently being played"""
+        return self._song
+
+    def offer(self, song, source: discord.AudioSource):
+        """Queue the source that should follow the current track"""
+        with self._lock:
+            if not self.active:
+                source.cleanup()
+                return
+            previous, self._next = self._next, (song, source)
+        if previous:
+            previous[1].cleanup()
+
+    def withdraw(self):
+        """Drop an offered next track that hasn't started yet"""
+        with self._lock:
+            pending, self._next = self._next, None
+            if pending and self._fading:
+                # Already audible - let it finish taking over
+                self._next = pending
+                return
+        if pending:
+            pending[1].cleanup()
+
+    @property
+    def current_source(self) -> discord.AudioSource:
+        """Pipeline of the song currently playing"""
+        return self._source
+
+    @property
+    def track_frames(self) -> int:
+        """Frames of the current song played so far"""
+        return self._frames_read
+
+    def replace_current(self, source: discord.AudioSource, frames_read: int) -> discord.AudioSource:
+        """Swap in a new pipeline for the current song (after a seek); returns the old one
+
+        The caller cleans the old source up a little later, since the audio
+        thread may still be reading from it.
+        """
+        with self._lock:
+            old, self._source = self._source, source
+            self._frames_read = frames_read
+            self._fading = False
+        return old
+
+    def _fade_start(self) -> Optional[int]:
+        """Frame index where the current track starts fading out, if it can"""
+        duration = getattr(self._song, 'duration', None)
+        if not self.fade_frames or not duration:
+            return None
+        return max(0, int(duration * FRAMES_PER_SECOND) - self.fade_frames)
+
+    def _advance(self, frames_read: int = 0):
+        """Make the offered track the current one"""
+        with self._lock:
+            old = self._source
+            self._song, self._source = self._next
+            self._next = None
+            self._frames_read = frames_read
+            self._fading = False
+        old.cleanup()
+        if self.on_advance:
+            self.on_advance(self._song)
+
+    def read(self) -> bytes:
+        # Sources are read outside the lock so offer()/withdraw() never wait on FFmpeg
+        if not self.active:
+            return b''
+
+        data = self._source.read()
+        with self._lock:
+            pending = self._next
+            fade_start = self._fade_start()
+            if len(data) == FRAME_SIZE:
+                self._frames_read += 1
+                if pending is None or fade_start is None or self._frames_read <= fade_start:
+                    return data
+                self._fading = True
+            elif pending is None:
+                return b''
+            position = self._frames_read - fade_start if self._fading and fade_start is not None else 0
+            # Committed to the handover - withdraw() leaves the next track alone from here
+            self._fading = True
+
+        if len(data) != FRAME_SIZE:
+            # Gapless: the next track's first frame follows immediately
+            self._advance(position)
+            data = self._source.read()
+            self._frames_read += 1
+            return data
+
+        # Crossfade window: overlap the head of the next track
+        incoming = pending[1].read()
+        if len(incoming) != FRAME_SIZE:
+            return data
+        mixed = _mix(data, incoming, (position - 1) / self.fade_frames, min(1.0, position / self.fade_frames))
+        if position >= self.fade_frames:
+            # The outgoing track is fully faded out - drop it
+            self._advance(position)
+        return mixed
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self):
+        with self._lock:
+            self.active = False
+            pending, self._next = self._next, None
+            self._source.cleanup()
+        if pending:
+            pending[1].cleanup()
@@ -0,0 +1,197 @@
+"""
+Local audio cache for Music Bot
+Stores frequently played tracks on disk so they play without hitting the remote source
+"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+import yt_dlp
+from utils.logger import logger
+
+
+def download_audio(page_url: str, directory: str, video_id: str) -> Optional[Dict[str, Any]]:
+    """Download the best Opus/WebM audio for a video; returns its path and size"""
+    ydl_opts = {
+        'format': 'bestaudio[ext=webm][acodec=opus]/bestaudio[ext=m4a]/bestaudio',
+        'outtmpl': os.path.join(directory, f"{video_id}.%(ext)s"),
+        'noplaylist': True,
+        'quiet': True,
+        'no_warnings': True,
+        'retries': 3,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(page_url, download=True)
+        if not info:
+            return None
+        downloads = info.get('requested_downloads') or [{}]
+        path = downloads[0].get('filepath') or ydl.prepare_filename(info)
+        if not os.path.exists(path):
+            return None
+        return {'path': path, 'size': os.path.getsize(path), 'acodec': info.get('acodec')}
+
+
+class AudioFileCache:
+    """Byte-budgeted on-disk track cache with LRU or LFU eviction"""
+
+    def __init__(self, directory: str, max_bytes: int, policy: str = 'lru', min_plays: int = 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.min_plays = min_plays
+        self.index_file = os.path.join(directory, 'index.json')
+        # video_id -> {path, size, acodec, last_used, uses}
+        self._files: Dict[str, Dict[str, Any]] = {}
+        # video_id -> play count, for deciding what is worth caching
+        self._plays: Dict[str, int] = {}
+        self._downloading = set()
+        # path -> size of evicted files that couldn't be deleted yet (still open, e.g. on Windows)
+        self._trash: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._ensure_cache_dir()
+        self._load()
+
+    def _ensure_cache_dir(self):
+        """Create cache directory if it doesn't exist"""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+    def _load(self):
+        """Load the index and drop entries whose files have gone missing"""
+        if not os.path.exists(self.index_file):
+            return
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._files = {
+                video_id: entry for video_id, entry in data.get('files', {}).items()
+                if os.path.exists(entry.get('path', ''))
+            }
+            self._plays = data.get('plays', {})
+            self._trash = data.get('trash', {})
+            self._purge_trash()
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error("audio_cache_load", e)
+
+    def save(self):
+        """Write the index to disk"""
+        try:
+            tmp_path = f"{self.index_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'files': self._files, 'plays': self._plays, 'trash': self._trash}, f)
+            os.replace(tmp_path, self.index_file)
+        except Exception as e:
+            logger.error("audio_cache_save", e)
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes currently used by cached files, including evicted ones not deleted yet"""
+        return sum(entry['size'] for entry in self._files.values()) + sum(self._trash.values())
+
+    def lookup(self, video_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached file entry for a video, or None"""
+        if not video_id:
+            return None
+
+        entry = self._files.get(video_id)
+        if entry is None or not os.path.exists(entry['path']):
+            self._files.pop(video_id, None)
+            self.misses += 1
+            return None
+
+        entry['last_used'] = time.time()
+        entry['uses'] = entry.get('uses', 0) + 1
+        self.hits += 1
+        return entry
+
+    def record_play(self, video_id: Optional[str]) -> bool:
+        """Count a play; returns True when the track just became worth caching"""
+        if not video_id:
+            return False
+
+        if self._trash:
+            self._purge_trash()
+        
+        self._plays[video_id] = self._plays.get(video_id, 0) + 1
+        if len(self._plays) > 20000:
+            # Keep the counter table bounded - one-off plays are the first to go
+            self._plays = dict(sorted(self._plays.items(), key=lambda item: item[1])[-10000:])
+        return (
+            self._plays[video_id] >= self.min_plays
+            and video_id not in self._files
+            and video_id not in self._downloading
+        )
+
+    def start_download(self, video_id: str):
+        """Mark a download as in progress so it isn't started twice"""
+        self._downloading.add(video_id)
+
+    def add(self, video_id: str, result: Optional[Dict[str, Any]]):
+        """Register a finished download and evict down to the byte budget"""
+        self._downloading.discard(video_id)
+        if not result:
+            return
+
+        self._files[video_id] = {
+            'path': result['path'],
+            'size': result['size'],
+            'acodec': result.get('acodec'),
+            'last_used': time.time(),
+            'uses': self._plays.get(video_id, 0),
+        }
+        self._evict()
+
+    def download_failed(self, video_id: str):
+        """Forget an in-progress marker after a failed download"""
+        self._downloading.discard(video_id)
+
+    def _evict(self):
+        """Remove files until we're within the byte budget"""
+        self._purge_trash()
+        total = self.total_bytes
+        while total > self.max_bytes and self._files:
+            if self.policy == 'lfu':
+                victim = min(self._files, key=lambda v: (self._files[v].get('uses', 0), self._files[v]['last_used']))
+            else:
+                victim = min(self._files, key=lambda v: self._files[v]['last_used'])
+
+            entry = self._files.pop(victim)
+            self.evictions += 1
+            if self._delete(entry['path']):
+                total -= entry['size']
+            else:
+                # Still being played - keep counting it and try again later
+                self._trash[entry['path']] = entry['size']
+    
+    @staticmethod
+    def _delete(path: str) -> bool:
+        """Delete a cached file; False if it is still in use"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+    
+    def _purge_trash(self):
+        """Retry deleting evicted files that were in use"""
+        for path in list(self._trash):
+            if self._delete(path):
+                del self._trash[path]
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache usage and hit/miss counters"""
+        return {
+            'policy': self.policy,
+            'files': len(self._files),
+            'used_mb': round(self.total_bytes / 1024 / 1024, 1),
+            'budget_mb': round(self.max_bytes / 1024 / 1024, 1),
+            'downloading': len(self._downloading),
+            'pending_deletes': len(self._trash),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,336 @@
+"""
+Extraction pool for Music Bot
+Runs yt-dlp on a dedicated, bounded executor with per-guild fair scheduling
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import ExitStack
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set
+from utils.logger import logger
+from audio.ydl_pool import ydl_pool
+
+
+# Job priorities - lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+def extract_entries(query: str, profile: str, overrides: Optional[dict] = None) -> List[dict]:
+    """Run yt-dlp and return every (non-empty) entry of the result"""
+    with ydl_pool.checkout(profile, overrides) as ydl:
+        info = ydl.extract_info(query, download=False)
+        if not info:
+            return []
+        info = ydl.sanitize_info(info)
+        entries = info.get('entries', [info]) if 'entries' in info else [info]
+        return [entry for entry in entries if entry]
+
+
+def extract_first_entry(query: str, profile: str) -> Optional[dict]:
+    """Run yt-dlp and return the first entry that has a playable URL"""
+    with ydl_pool.checkout(profile) as ydl:
+        info = ydl.extract_info(query, download=False)
+        if not info:
+            return None
+        info = ydl.sanitize_info(info)
+        if 'entries' in info and info['entries']:
+            # Get the first valid entry
+            for entry in info['entries']:
+                if entry and entry.get('url'):
+                    return entry
+            return None
+        elif info.get('url'):
+            return info
+        return None
+
+
+class PlaylistCursor:
+    """One playlist extraction read page by page
+
+    The playlist is extracted once with process=False, so yt-dlp hands back
+    its entries as a lazy generator and only fetches continuation pages as
+    they are read. Each next_page() call runs on a worker thread; the cursor
+    holds its YoutubeDL instance until close(). Thread mode only - the state
+    can't cross a process boundary.
+    """
+
+    # url / url_transparent results followed before giving up
+    MAX_REDIRECTS = 3
+
+    def __init__(self, query: str, profile: str, limit: int):
+        self.query = query
+        self.profile = profile
+        self.remaining = limit
+        self._stack = ExitStack()
+        self._lock = threading.Lock()
+        self._ydl = None
+        self._entries: Optional[Iterator] = None
+        self._busy = False
+        self._closed = False
+
+    def _open(self):
+        """Extract the playlist without processing its entries"""
+        self._ydl = self._stack.enter_context(ydl_pool.checkout(self.profile))
+        info = self._ydl.extract_info(self.query, download=False, process=False)
+        for _ in range(self.MAX_REDIRECTS):
+            # e.g. watch?v=...&list=... points at the playlist tab
+            if not info or info.get('_type') not in ('url', 'url_transparent'):
+                break
+            info = self._ydl.extract_info(info['url'], download=False, process=False)
+
+        if not info:
+            self._entries = iter(())
+        elif 'entries' in info:
+            self._entries = iter(info['entries'] or ())
+        else:
+            self._entries = iter([info])
+
+    def next_page(self, size: int) -> List[dict]:
+        """Read up to size more entries; an empty list means the playlist is done"""
+        with self._lock:
+            if self._closed:
+                return []
+            self._busy = True
+        try:
+            if self._entries is None:
+                self._open()
+            page = [
+                self._ydl.sanitize_info(entry)
+                for entry in islice(self._entries, min(size, self.remaining))
+                if entry
+            ]
+            self.remaining -= len(page)
+            return page
+        finally:
+            with self._lock:
+                self._busy = False
+                if self._closed:
+                    self._stack.close()
+
+    def close(self):
+        """Give the YoutubeDL instance back (after the running page, if any)"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if not self._busy:
+                self._stack.close()
+
+
+def entry_page_url(entry: dict) -> Optional[str]:
+    """Best page URL for an entry, including flat playlist stubs that only carry an id"""
+    if entry.get('webpage_url'):
+        return entry['webpage_url']
+    url = entry.get('url')
+    if url and url.startswith(('http://', 'https://')):
+        return url
+    if entry.get('id') and entry.get('ie_key', 'Youtube') == 'Youtube':
+        return f"https://www.youtube.com/watch?v={entry['id']}"
+    return url
+
+
+def entry_thumbnail(entry: dict) -> Optional[str]:
+    """Thumbnail for an entry; flat stubs only list them under 'thumbnails'"""
+    if entry.get('thumbnail'):
+        return entry['thumbnail']
+    thumbnails = entry.get('thumbnails') or []
+    return thumbnails[-1].get('url') if thumbnails else None
+
+
+@dataclass(eq=False)
+class _Job:
+    """A queued extraction call"""
+    fn: Callable
+    args: tuple
+    future: asyncio.Future
+    guild_id: int
+    priority: int
+    tag: Optional[str] = None
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class ExtractionPool:
+    """Dedicated executor for yt-dlp work, fair across guilds and priority-aware"""
+
+    def __init__(self, workers: int, mode: str = 'thread'):
+        self.workers = max(1, workers)
+        self.mode = mode
+        self._executor: Optional[Executor] = None
+        # priority -> guild_id -> pending jobs; guild order rotates for round-robin
+        self._pending: Dict[int, "OrderedDict[int, Deque[_Job]]"] = {
+            INTERACTIVE: OrderedDict(),
+            BACKGROUND: OrderedDict(),
+        }
+        self._running = 0
+        # Queued or running jobs by caller tag, and tags to run at INTERACTIVE once they arrive
+        self._tagged: Dict[str, _Job] = {}
+        self._urgent: Set[str] = set()
+        self.submitted = 0
+        self.promoted = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+        self._total_wait = 0.0
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use"""
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='extract'
+                )
+            logger.info(f"Extraction pool started ({self.mode} mode, {self.workers} workers)")
+        return self._executor
+
+    async def run(self, fn: Callable, *args, guild_id: int = 0, priority: int = INTERACTIVE,
+                  tag: Optional[str] = None) -> Any:
+        """Queue fn(*args) for the pool and wait for its result
+
+        ``tag`` lets promote() find the job until it finishes.
+        """
+        if tag is not None and tag in self._urgent:
+            self._urgent.discard(tag)
+            priority = INTERACTIVE
+
+        loop = asyncio.get_running_loop()
+        job = _Job(fn=fn, args=args, future=loop.create_future(), guild_id=guild_id, priority=priority, tag=tag)
+
+        self._pending[priority].setdefault(guild_id, deque()).append(job)
+        if tag is not None:
+            self._tagged[tag] = job
+        self.submitted += 1
+        self.max_queued = max(self.max_queued, self.queued())
+
+        self._dispatch()
+        return await job.future
+
+    def promote(self, tag: str):
+        """Someone is now waiting on this job interactively - move it out of the background queue"""
+        job = self._tagged.get(tag)
+        if job is None:
+            # Not submitted yet (its flight hasn't started) - queue it as interactive when it is
+            self._urgent.add(tag)
+            return
+        if job.priority == INTERACTIVE:
+            return
+        # Already running jobs are left alone
+
+        jobs = self._pending[job.priority].get(job.guild_id)
+        if not jobs or not any(queued is job for queued in jobs):
+            return
+        jobs.remove(job)
+        if not jobs:
+            del self._pending[job.priority][job.guild_id]
+
+        job.priority = INTERACTIVE
+        self._pending[INTERACTIVE].setdefault(job.guild_id, deque()).append(job)
+        self.promoted += 1
+
+    def forget_tag(self, tag: str):
+        """Drop a pending promotion for a tag whose job never got queued"""
+        self._urgent.discard(tag)
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pick the next job: highest priority first, then round-robin across guilds"""
+        for priority in (INTERACTIVE, BACKGROUND):
+            guild_jobs = self._pending[priority]
+            while guild_jobs:
+                guild_id, jobs = next(iter(guild_jobs.items()))
+                job = jobs.popleft()
+                if jobs:
+                    guild_jobs.move_to_end(guild_id)
+                else:
+                    del guild_jobs[guild_id]
+
+                # Caller gave up (e.g. prefetch re-planned) before we got to it
+                if job.future.done():
+                    self._untag(job)
+                    continue
+                return job
+        return None
+
+    def _untag(self, job: _Job):
+        if job.tag is not None and self._tagged.get(job.tag) is job:
+            del self._tagged[job.tag]
+
+    def _dispatch(self):
+        """Start queued jobs while there are free workers"""
+        while self._running < self.workers:
+            job = self._next_job()
+            if job is None:
+                return
+
+            self._running += 1
+            self._total_wait += time.monotonic() - job.queued_at
+            loop = asyncio.get_running_loop()
+            task = loop.run_in_executor(self._get_executor(), job.fn, *job.args)
+            task.add_done_callback(partial(self._on_done, job))
+
+    def _on_done(self, job: _Job, task: asyncio.Future):
+        """Hand the result back to the caller and start the next job"""
+        self._running -= 1
+        self._untag(job)
+
+        if task.cancelled():
+            self.failed += 1
+            if not job.future.done():
+                job.future.cancel()
+        elif task.exception() is not None:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(task.exception())
+        else:
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(task.result())
+
+        self._dispatch()
+
+    def queued(self, priority: Optional[int] = None) -> int:
+        """Number of jobs waiting for a worker"""
+        priorities = [priority] if priority is not None else list(self._pending)
+        return sum(
+            len(jobs)
+            for p in priorities
+            for jobs in self._pending[p].values()
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue-depth and throughput metrics for sizing the pool"""
+        started = self.completed + self.failed + self._running
+        guild_depths: Dict[int, int] = {}
+        for guild_jobs in self._pending.values():
+            for guild_id, jobs in guild_jobs.items():
+                guild_depths[guild_id] = guild_depths.get(guild_id, 0) + len(jobs)
+
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'running': self._running,
+            'queued': self.queued(),
+            'queued_interactive': self.queued(INTERACTIVE),
+            'queued_background': self.queued(BACKGROUND),
+            'max_queued': self.max_queued,
+            'queued_guilds': len(guild_depths),
+            'deepest_guild_queue': max(guild_depths.values(), default=0),
+            'submitted': self.submitted,
+            'promoted': self.promoted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'avg_wait_ms': round(self._total_wait / started * 1000, 1) if started else 0.0,
+        }
+
+    def shutdown(self):
+        """Stop the executor without waiting for running extractions"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -3,15 +3,32 @@ Audio management for Music Bot
 Handles audio sources, playback, and queue management
 """
 import asyncio
+import time
 import discord
-import yt_dlp
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from config import config
 from utils.logger import logger, log_audio_event
-from spotipy import Spotify
-from spotipy.oauth2 import SpotifyClientCredentials
+from audio.stream_cache import StreamCache, stream_key, stream_expiry, extract_video_id, query_key
+from audio.prefetch import Prefetcher
+from audio.extraction import ExtractionPool, PlaylistCursor, extract_entries, extract_first_entry, INTERACTIVE, BACKGROUND
+from audio.ydl_pool import ydl_pool, SEARCH, SINGLE, PLAYLIST, FLAT
+from audio.spotify import SpotifyClient, parse_spotify_url
+from audio.match_cache import MatchCache
+from audio.singleflight import SingleFlight
+from audio.disk_cache import AudioFileCache, download_audio
+from audio.sources import build_audio_source, supports_live_volume, buffered_frames, TrackedSource
+from audio.telemetry import PlaybackTelemetry
+from audio.player import GuildPlayer
+from audio.timers import TimerWheel, ALONE, IDLE, RETRY
+from audio.circuit_breaker import CircuitBreaker, CircuitOpenError, NOT_FOUND, classify_error
+from audio.negative_cache import NegativeCache, KnownUnresolvableError
+from utils.event_bus import event_bus
+from audio.prewarm import Prewarmer
+from audio.refresher import StreamRefresher
+from audio.crossfade import CrossfadeSource
+from audio.volume import make_volume_transformer
 
 
 @dataclass
@@ -24,8 +41,25 @@ class Song:
     thumbnail: Optional[str] = None
     requester_id: int = 0
     is_lazy: bool = False
+    expires_at: Optional[float] = None
+    codec: Optional[str] = None
+    spotify_id: Optional[str] = None
+    isrc: Optional[str] = None
     added_at: datetime = field(default_factory=datetime.now)
     
+    def is_stale(self) -> bool:
+        """Check if the resolved stream URL has expired (or is about to)"""
+        if self.expires_at is None:
+            return False
+        return self.expires_at - config.stream_expiry_margin <= time.time()
+    
+    def mark_stale(self):
+        """Drop the resolved stream so the song gets resolved again before playing"""
+        self.url = None
+        self.expires_at = None
+        self.codec = None
+        self.is_lazy = True
+    
     def format_duration(self) -> str:
         """Format duration as MM:SS or HH:MM:SS"""
         if not self.duration:
@@ -49,21 +83,104 @@ class AudioManager:
         self.guild_current_index: Dict[int, int] = {}
         self.guild_volumes: Dict[int, float] = {}
         self.repeat_flags: Dict[int, bool] = {}
-        self.alone_timers: Dict[int, asyncio.Task] = {}
+        # Alone/idle disconnect timers for every guild, keyed by (guild_id, kind)
+        self.timers = TimerWheel()
+        self.stream_cache = StreamCache(
+            max_size=config.stream_cache_size,
+            expiry_margin=config.stream_expiry_margin,
+            default_ttl=config.stream_default_ttl
+        )
+        self.extraction_pool = ExtractionPool(
+            workers=config.extraction_workers,
+            mode=config.extraction_mode
+        )
+        self.inflight = SingleFlight()
+        self.negative_cache = NegativeCache(
+            path=config.negative_cache_file,
+            max_entries=config.negative_cache_size
+        )
+        self.breaker = CircuitBreaker(
+            threshold=config.breaker_threshold,
+            base_backoff=config.breaker_backoff,
+            max_backoff=config.breaker_max_backoff
+        )
+        self.match_cache = MatchCache(
+            path=config.match_cache_file,
+            max_entries=config.match_cache_size
+        )
+        self.audio_cache = None
+        if config.audio_cache_enabled:
+            self.audio_cache = AudioFileCache(
+                directory=config.audio_cache_dir,
+                max_bytes=config.audio_cache_max_mb * 1024 * 1024,
+                policy=config.audio_cache_policy,
+                min_plays=config.audio_cache_min_plays
+            )
+        self.prefetcher = Prefetcher(
+            self,
+            depth=config.prefetch_depth,
+            concurrency=config.prefetch_concurrency
+        )
+        self.refresher = StreamRefresher(
+            self,
+            interval=config.refresh_interval,
+            scan_depth=config.refresh_scan_depth,
+            concurrency=config.refresh_concurrency
+        )
+        # Gapless/crossfade sessions, one long-lived source per playing guild
+        self.playback_sessions: Dict[int, CrossfadeSource] = {}
+        # Outermost source handed to each guild's player, for position tracking and seeking
+        self.now_playing: Dict[int, TrackedSource] = {}
+        self.players: Dict[int, GuildPlayer] = {}
+        self.telemetry = PlaybackTelemetry(
+            self,
+            snapshot_file=config.playback_snapshot_file,
+            snapshot_interval=config.playback_snapshot_interval
+        )
+        self.prewarmer = Prewarmer(
+            self,
+            lead=config.prewarm_lead,
+            frames=config.prewarm_frames,
+            enabled=config.prewarm_enabled or self.continuous_playback
+        )
         
         # Initialize Spotify client if credentials are available
         self.spotify_client = None
         if config.spotify_client_id and config.spotify_client_secret:
             try:
-                auth_manager = SpotifyClientCredentials(
+                self.spotify_client = SpotifyClient(
                     client_id=config.spotify_client_id,
-                    client_secret=config.spotify_client_secret
+                    client_secret=config.spotify_client_secret,
+                    concurrency=config.spotify_concurrency
                 )
-                self.spotify_client = Spotify(auth_manager=auth_manager)
                 logger.info("Spotify integration initialized successfully")
             except Exception as e:
                 logger.error("spotify_init", e)
     
+    @property
+    def continuous_playback(self) -> bool:
+        """Whether tracks are spliced/crossfaded inside one long-lived source"""
+        return config.gapless or config.crossfade_ms > 0
+    
+    @property
+    def crossfade_seconds(self) -> float:
+        """How long consecutive tracks overlap"""
+        return max(0, config.crossfade_ms) / 1000
+    
+    def get_player(self, guild_id: int, handler: Callable) -> GuildPlayer:
+        """Get (or create) the guild's player, which serializes playback transitions"""
+        player = self.players.get(guild_id)
+        if player is None:
+            player = GuildPlayer(guild_id, handler)
+            self.players[guild_id] = player
+        return player
+    
+    def remove_player(self, guild_id: int):
+        """Shut down a guild's player (after leaving voice)"""
+        player = self.players.pop(guild_id, None)
+        if player:
+            player.close()
+    
     def ensure_queue(self, guild_id: int):
         """Ensure guild has a queue initialized"""
         if guild_id not in self.guild_queues:
@@ -87,6 +204,20 @@ class AudioManager:
             return queue[current_idx]
         return None
     
+    def peek_next_song(self, guild_id: int) -> Optional[Song]:
+        """Get the song that plays after the current one, if any"""
+        if self.is_repeat(guild_id):
+            return self.get_current_song(guild_id)
+        
+        queue = self.guild_queues.get(guild_id, [])
+        next_idx = self.guild_current_index.get(guild_id, 0) + 1
+        return queue[next_idx] if next_idx < len(queue) else None
+    
+    def _queue_changed(self, guild_id: int):
+        """Re-plan look-ahead work after the queue or its position changed"""
+        self.prefetcher.schedule(guild_id)
+        self.prewarmer.queue_changed(guild_id)
+    
     def add_songs(self, guild_id: int, songs: List[Song]) -> int:
         """Add songs to queue and return starting position"""
         self.ensure_queue(guild_id)
@@ -101,6 +232,7 @@ class AudioManager:
             # Queue was empty, start from beginning
             self.guild_current_index[guild_id] = 0
         
+        self._queue_changed(guild_id)
         return queue_length_before
     
     def remove_song(self, guild_id: int, index: int) -> Optional[Song]:
@@ -115,9 +247,28 @@ class AudioManager:
             if index <= current_idx and current_idx > 0:
                 self.guild_current_index[guild_id] = current_idx - 1
             
+            self._queue_changed(guild_id)
             return removed_song
         return None
     
+    def remove_songs(self, guild_id: int, indices: List[int]) -> List[Song]:
+        """Remove several songs in one pass (the current song's position is kept)"""
+        queue = self.get_queue(guild_id)
+        doomed = {index for index in indices if 0 <= index < len(queue)}
+        if not doomed:
+            return []
+        
+        current_idx = self.guild_current_index.get(guild_id, 0)
+        removed = [song for i, song in enumerate(queue) if i in doomed]
+        queue[:] = [song for i, song in enumerate(queue) if i not in doomed]
+        
+        # Shift the current index back by the songs removed before it
+        shift = sum(1 for index in doomed if index < current_idx)
+        self.guild_current_index[guild_id] = max(0, min(current_idx - shift, len(queue) - 1))
+        
+        self._queue_changed(guild_id)
+        return removed
+    
     def move_song(self, guild_id: int, from_idx: int, to_idx: int) -> bool:
         """Move song from one position to another"""
         queue = self.get_queue(guild_id)
@@ -138,6 +289,7 @@ class AudioManager:
         elif to_idx <= current_idx < from_idx:
             self.guild_current_index[guild_id] = current_idx + 1
         
+        self._queue_changed(guild_id)
         return True
     
     def shuffle_queue(self, guild_id: int):
@@ -160,9 +312,16 @@ class AudioManager:
             # Put current song back at the beginning
             queue.insert(0, current_song)
             self.guild_current_index[guild_id] = 0
+            
+            self._queue_changed(guild_id)
     
     def clear_queue(self, guild_id: int):
         """Clear the entire queue"""
+        self.prefetcher.cancel(guild_id)
+        self.prewarmer.cancel(guild_id)
+        self.playback_sessions.pop(guild_id, None)
+        self.now_playing.pop(guild_id, None)
+        self.telemetry.forget(guild_id)
         self.guild_queues[guild_id] = []
         self.guild_current_index[guild_id] = 0
     
@@ -170,6 +329,25 @@ class AudioManager:
         """Set volume for a guild"""
         self.guild_volumes[guild_id] = max(config.min_volume, min(config.max_volume, volume))
     
+    def apply_live_volume(self, guild_id: int, voice_client, volume: float) -> bool:
+        """Set a guild's volume and apply it to the playing source if it supports that"""
+        self.set_volume(guild_id, volume)
+        
+        if voice_client and supports_live_volume(voice_client.source):
+            voice_client.source.volume = self.get_volume(guild_id)
+            return True
+        return False
+    
+    async def apply_volume(self, guild_id: int, voice_client, volume: float):
+        """Set a guild's volume and make the playing song use it right away"""
+        if self.apply_live_volume(guild_id, voice_client, volume):
+            return
+        
+        # FFmpeg applies the volume for Opus sources - restart it where we are
+        position = self.get_position(guild_id)
+        if position is not None:
+            await self.seek(guild_id, voice_client, position)
+    
     def get_volume(self, guild_id: int) -> float:
         """Get volume for a guild"""
         return self.guild_volumes.get(guild_id, config.default_volume)
@@ -177,6 +355,7 @@ class AudioManager:
     def set_repeat(self, guild_id: int, repeat: bool):
         """Set repeat flag for a guild"""
         self.repeat_flags[guild_id] = repeat
+        self.prewarmer.queue_changed(guild_id)
     
     def is_repeat(self, guild_id: int) -> bool:
         """Check if repeat is enabled for a guild"""
@@ -188,6 +367,7 @@ class AudioManager:
         
         if 0 <= index < len(queue):
             self.guild_current_index[guild_id] = index
+            self._queue_changed(guild_id)
             return True
         return False
     
@@ -198,6 +378,7 @@ class AudioManager:
         
         if current_idx < len(queue) - 1:
             self.guild_current_index[guild_id] = current_idx + 1
+            self._queue_changed(guild_id)
             return True
         return False
     
@@ -207,15 +388,77 @@ class AudioManager:
         
         if current_idx > 0:
             self.guild_current_index[guild_id] = current_idx - 1
+            self._queue_changed(guild_id)
             return True
         return False
     
-    async def resolve_lazy_song(self, song: Song) -> Song:
+    async def resolve_lazy_song(self, song: Song, guild_id: int = 0, priority: int = INTERACTIVE) -> Song:
         """Resolve a lazy-loaded song to get actual audio URL with improved error handling"""
         if not song.is_lazy:
             return song
         
+        # Reuse a recent resolution of the same video if we have one
+        if self._apply_cached_stream(song):
+            return song
+        
+        # Known Spotify match: go straight to the video and skip searching
+        match = self.match_cache.get(song.spotify_id, song.isrc)
+        if match:
+            match_url = f"https://www.youtube.com/watch?v={match['video_id']}"
+            info, search_query, _ = await self._race_attempts([match_url], guild_id, priority)
+            if info:
+                self._apply_resolved_info(song, info, search_query)
+                log_audio_event(guild_id, "song_resolved_from_match", song.title)
+                return song
+            # The matched video went away - search again and re-learn the match
+            self.match_cache.forget(song.spotify_id, song.isrc)
+        
         # Try multiple search strategies
+        search_attempts = self._resolution_attempts(song)
+        
+        # Every variant failed recently for good - don't run the loop again
+        failure = self._known_failure(search_attempts)
+        if failure:
+            raise KnownUnresolvableError(song.title, failure)
+        
+        deadline = asyncio.get_running_loop().time() + config.resolve_deadline
+        info, search_query, last_error = None, None, None
+        
+        # The queued video itself goes first and alone - a faster search hit could be a different upload
+        exact = search_attempts[:1] if self._is_http_url(search_attempts[0]) else []
+        if exact:
+            info, search_query, last_error = await self._race_attempts(exact, guild_id, priority, deadline)
+        
+        if not info:
+            # Only now hedge among the search variants
+            info, search_query, search_error = await self._race_attempts(
+                search_attempts[len(exact):], guild_id, priority, deadline
+            )
+            last_error = search_error or last_error
+        
+        if info:
+            # Successfully resolved! Update song with resolved information
+            self._apply_resolved_info(song, info, search_query)
+            
+            if song.spotify_id or song.isrc:
+                video_id = extract_video_id(info.get('webpage_url'))
+                if video_id:
+                    self.match_cache.record(song.spotify_id, song.isrc, video_id, info)
+            
+            attempt = search_attempts.index(search_query)
+            log_audio_event(guild_id, "song_resolved", f"{song.title} (attempt {attempt + 1})")
+            return song
+        
+        # All attempts failed
+        error_msg = f"Failed to resolve song after {len(search_attempts)} attempts: {song.title}"
+        if last_error:
+            error_msg += f" (Last error: {str(last_error)})"
+        
+        logger.error("resolve_lazy_song_all_attempts_failed", Exception(error_msg), song_title=song.title)
+        raise ValueError(error_msg)
+    
+    def _resolution_attempts(self, song: Song) -> List[str]:
+        """Queries tried to resolve a lazy song, in preference order"""
         search_attempts = []
         
         # If we have a direct URL, try that first
@@ -231,132 +474,251 @@ class AudioManager:
             song.title  # Original title as fallback
         ])
         
+        # Drop duplicate variants (e.g. titles without brackets) so we don't extract twice
+        return list(dict.fromkeys(search_attempts))
+    
+    def _known_failure(self, queries: List[str]) -> Optional[str]:
+        """Failure class if every query is in the negative cache, else None"""
+        failure = None
+        for query in queries:
+            failure = self.negative_cache.get(query_key(query))
+            if failure is None:
+                return None
+        return failure
+    
+    def is_known_unplayable(self, song: Song) -> bool:
+        """Whether resolving a lazy song would only hit known failures"""
+        return song.is_lazy and self._known_failure(self._resolution_attempts(song)) is not None
+    
+    async def _race_attempts(self, search_attempts: List[str], guild_id: int, priority: int,
+                             deadline: Optional[float] = None) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[Exception]]:
+        """Run query variants, up to the hedge fan-out at once, and return the first valid entry
+        
+        Returns (info, winning query, last error); info is None if every variant failed.
+        ``deadline`` (loop time) defaults to resolve_deadline from now.
+        """
         last_error = None
+        fanout = max(1, config.resolve_hedge_fanout)
+        pending_queries = list(search_attempts)
+        running: Dict[asyncio.Future, str] = {}
+        loop = asyncio.get_running_loop()
+        if deadline is None:
+            deadline = loop.time() + config.resolve_deadline
         
-        for attempt, search_query in enumerate(search_attempts):
-            try:
-                ydl_opts = config.ydl_options.copy()
-                ydl_opts['quiet'] = True  # Reduce noise in logs
-                
-                # Configure search method
-                if self._is_http_url(search_query):
-                    ydl_opts['noplaylist'] = True
-                else:
-                    ydl_opts['default_search'] = 'ytsearch1'
-                    ydl_opts['noplaylist'] = True
-                
-                def _extract_info():
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(search_query, download=False)
-                        if 'entries' in info and info['entries']:
-                            # Get the first valid entry
-                            for entry in info['entries']:
-                                if entry and entry.get('url'):
-                                    return entry
-                            return None
-                        elif info and info.get('url'):
-                            return info
-                        return None
+        try:
+            while pending_queries or running:
+                # Keep up to `fanout` variants in flight, in preference order
+                while pending_queries and len(running) < fanout:
+                    search_query = pending_queries.pop(0)
+                    task = asyncio.ensure_future(self._extract_stream(search_query, guild_id, priority))
+                    running[task] = search_query
                 
-                # Run in executor to avoid blocking
-                loop = asyncio.get_event_loop()
-                info = await loop.run_in_executor(None, _extract_info)
+                timeout = deadline - loop.time()
+                done = set()
+                if timeout > 0:
+                    done, _ = await asyncio.wait(set(running), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    last_error = asyncio.TimeoutError(f"no result within {config.resolve_deadline}s")
+                    break
                 
-                if info and info.get('url'):
-                    # Successfully resolved! Update song with resolved information
-                    song.url = info['url']
-                    song.title = info.get('title', song.title)
-                    song.duration = info.get('duration', song.duration)
-                    song.thumbnail = info.get('thumbnail', song.thumbnail)
-                    
-                    if not song.webpage_url or not song.webpage_url.startswith('http'):
-                        song.webpage_url = info.get('webpage_url', song.webpage_url)
+                # Prefer the earlier variant if several finished together
+                for task in sorted(done, key=lambda t: search_attempts.index(running[t])):
+                    search_query = running.pop(task)
+                    attempt = search_attempts.index(search_query)
+                    try:
+                        info = task.result()
+                    except CircuitOpenError:
+                        # Rate limited - the other variants would be refused too
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        logger.warning(f"Resolution attempt {attempt + 1} failed for '{search_query}': {str(e)}")
+                        continue
                     
-                    song.is_lazy = False
-                    
-                    log_audio_event(0, "song_resolved", f"{song.title} (attempt {attempt + 1})")
-                    return song
-                else:
-                    logger.warning(f"No valid URL found for: {search_query}")
-                    
-            except Exception as e:
-                last_error = e
-                logger.warning(f"Resolution attempt {attempt + 1} failed for '{search_query}': {str(e)}")
-                continue
-        
-        # All attempts failed
-        error_msg = f"Failed to resolve song after {len(search_attempts)} attempts: {song.title}"
-        if last_error:
-            error_msg += f" (Last error: {str(last_error)})"
+                    if info and info.get('url'):
+                        return info, search_query, last_error
+                    else:
+                        logger.warning(f"No valid URL found for: {search_query}")
+        finally:
+            # First valid result wins - cancel the other variants still in flight
+            for task in running:
+                task.cancel()
         
-        logger.error("resolve_lazy_song_all_attempts_failed", Exception(error_msg), song_title=song.title)
-        raise ValueError(error_msg)
+        return None, None, last_error
+    
+    async def _extract_stream(self, search_query: str, guild_id: int, priority: int) -> Optional[Dict[str, Any]]:
+        """Run a single resolution attempt on the extraction pool"""
+        # Configure search method
+        profile = SINGLE if self._is_http_url(search_query) else SEARCH
+        return await self.extract(extract_first_entry, search_query, profile, guild_id=guild_id, priority=priority)
+    
+    async def extract(self, fn: Callable, query: str, profile: str, overrides: Optional[dict] = None,
+                      guild_id: int = 0, priority: int = INTERACTIVE) -> Any:
+        """Run an extraction helper on the pool, sharing the result with identical concurrent requests"""
+        # Playlist URLs keep their list= part, so only single lookups collapse to a video id
+        normalized = query_key(query) if profile in (SEARCH, SINGLE) else query
+        key = f"{fn.__name__}:{profile}:{normalized}"
+        if overrides:
+            key += f":{sorted(overrides.items())}"
+        
+        single = profile in (SEARCH, SINGLE)
+        if single:
+            failure = self.negative_cache.get(normalized)
+            if failure:
+                raise KnownUnresolvableError(query, failure)
+        
+        promoted = priority == INTERACTIVE and self.inflight.in_flight(key)
+        if promoted:
+            # Joining a prefetch/refresh - don't wait behind the whole background queue
+            self.extraction_pool.promote(key)
+        
+        args = (query, profile, overrides) if overrides else (query, profile)
+        try:
+            result = await self.inflight.do(
+                key,
+                lambda: self._guarded_extract(fn, args, guild_id, priority, tag=key)
+            )
+        except (CircuitOpenError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            if single:
+                # Remembered only if the error is about the video/query itself
+                self.negative_cache.record(normalized, classify_error(e), str(e))
+            raise
+        finally:
+            if promoted and not self.inflight.in_flight(key):
+                # The flight may have ended before it ever reached the pool
+                self.extraction_pool.forget_tag(key)
+        
+        if single and not result:
+            self.negative_cache.record(normalized, NOT_FOUND, "no results")
+        return result
+    
+    async def _guarded_extract(self, fn: Callable, args: tuple, guild_id: int, priority: int,
+                               tag: Optional[str] = None) -> Any:
+        """Run one extraction through the circuit breaker"""
+        try:
+            probe = self.breaker.before_call()
+        except CircuitOpenError:
+            if tag is not None:
+                self.extraction_pool.forget_tag(tag)
+            raise
+        try:
+            result = await self.extraction_pool.run(fn, *args, guild_id=guild_id, priority=priority, tag=tag)
+        except asyncio.CancelledError:
+            # Hedge losers are cancelled all the time - only an abandoned probe frees the slot
+            if probe:
+                self.breaker.release_probe()
+            raise
+        except Exception as e:
+            self.breaker.record_failure(e, probe=probe)
+            raise
+        self.breaker.record_success()
+        return result
+    
+    def _apply_resolved_info(self, song: Song, info: Dict[str, Any], search_query: str):
+        """Copy a resolved yt-dlp entry onto a song and cache the stream"""
+        song.url = info['url']
+        song.expires_at = stream_expiry(info['url'], config.stream_default_ttl)
+        song.codec = info.get('acodec')
+        song.title = info.get('title', song.title)
+        song.duration = info.get('duration', song.duration)
+        song.thumbnail = info.get('thumbnail', song.thumbnail)
+        
+        if not song.webpage_url or not song.webpage_url.startswith('http'):
+            song.webpage_url = info.get('webpage_url', song.webpage_url)
+        
+        song.is_lazy = False
+        
+        # Remember the stream under both the requested and the canonical key
+        self.stream_cache.put(stream_key(search_query), info)
+        self.stream_cache.put(stream_key(info.get('webpage_url')), info)
     
     async def get_spotify_tracks(self, url: str) -> List[Song]:
         """Extract tracks from Spotify URL"""
+        return [song async for page in self.iter_spotify_tracks(url) for song in page]
+    
+    async def iter_spotify_tracks(self, url: str) -> AsyncIterator[List[Song]]:
+        """Yield tracks from a Spotify URL one page at a time"""
         if not self.spotify_client:
-            return []
+            return
         
-        tracks = []
+        parsed = parse_spotify_url(url)
+        if not parsed:
+            return
+        kind, spotify_id = parsed
         
         try:
-            if 'track' in url:
-                track = self.spotify_client.track(url)
-                search_query = f"{track['name']} {track['artists'][0]['name']} official audio"
-                tracks.append(Song(
-                    title=f"{track['name']} - {track['artists'][0]['name']}",
-                    webpage_url=search_query,
-                    duration=track.get('duration_ms', 0) // 1000,
-                    is_lazy=True
-                ))
-                
-            elif 'playlist' in url:
-                # Handle paginated playlist results
-                results = self.spotify_client.playlist_tracks(url, limit=50)
+            if kind == 'track':
+                track = await self.spotify_client.track(spotify_id)
+                yield [self._spotify_song(track)]
                 
-                while results:
-                    for item in results['items']:
-                        track = item.get('track')
-                        if track and track.get('name'):  # Ensure track exists and has a name
-                            search_query = f"{track['name']} {track['artists'][0]['name']} official audio"
-                            tracks.append(Song(
-                                title=f"{track['name']} - {track['artists'][0]['name']}",
-                                webpage_url=search_query,
-                                duration=track.get('duration_ms', 0) // 1000,
-                                is_lazy=True
-                            ))
-                    
-                    # Get next page if available (limit to 100 songs to prevent overwhelming)
-                    if results['next'] and len(tracks) < 100:
-                        results = self.spotify_client.next(results)
-                    else:
-                        break
-                        
-            elif 'album' in url:
-                # Handle paginated album results
-                results = self.spotify_client.album_tracks(url, limit=50)
-                
-                while results:
-                    for track in results['items']:
-                        if track and track.get('name'):  # Ensure track exists and has a name
-                            search_query = f"{track['name']} {track['artists'][0]['name']} official audio"
-                            tracks.append(Song(
-                                title=f"{track['name']} - {track['artists'][0]['name']}",
-                                webpage_url=search_query,
-                                duration=track.get('duration_ms', 0) // 1000,
-                                is_lazy=True
-                            ))
-                    
-                    # Get next page if available (limit to 100 songs to prevent overwhelming)
-                    if results['next'] and len(tracks) < 100:
-                        results = self.spotify_client.next(results)
-                    else:
-                        break
+            else:
+                # Playlist/album pages arrive in order; the rest are fetched concurrently
+                async for tracks in self.spotify_client.iter_tracks(kind, spotify_id, config.spotify_track_limit):
+                    yield [self._spotify_song(track) for track in tracks]
                     
         except Exception as e:
             logger.error("get_spotify_tracks", e)
+    
+    def _spotify_song(self, track: Dict[str, Any]) -> Song:
+        """Build a lazy song from a Spotify track object"""
+        search_query = f"{track['name']} {track['artists'][0]['name']} official audio"
+        return Song(
+            title=f"{track['name']} - {track['artists'][0]['name']}",
+            webpage_url=search_query,
+            duration=(track.get('duration_ms') or 0) // 1000,
+            spotify_id=track.get('id'),
+            isrc=(track.get('external_ids') or {}).get('isrc'),
+            is_lazy=True
+        )
+    
+    async def iter_youtube_playlist(self, url: str, guild_id: int = 0) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield yt-dlp entries of a playlist one page at a time, as they are listed"""
+        if not config.playlist_flat:
+            # Full extraction can't be paged cheaply - one big page
+            yield await self.extract(extract_entries, url, PLAYLIST, guild_id=guild_id)
+            return
+        
+        page_size = config.playlist_page_size
         
-        return tracks
+        if self.extraction_pool.mode == 'process':
+            # A cursor can't live in another process - list once and page locally
+            entries = await self.extract(extract_entries, url, FLAT, guild_id=guild_id)
+            for start in range(0, len(entries), page_size):
+                yield entries[start:start + page_size]
+            return
+        
+        # One extraction for the whole playlist; continuation pages are fetched as we read
+        cursor = PlaylistCursor(url, FLAT, config.playlist_max_entries)
+        try:
+            while True:
+                entries = await self._guarded_extract(cursor.next_page, (page_size,), guild_id, INTERACTIVE)
+                if entries:
+                    yield entries
+                
+                # A short page means we've reached the end of the playlist
+                if len(entries) < page_size:
+                    break
+        finally:
+            cursor.close()
+    
+    def _apply_cached_stream(self, song: Song) -> bool:
+        """Fill in a lazy song from the stream cache, return True on a hit"""
+        cached = self.stream_cache.get(stream_key(song.webpage_url))
+        if not cached:
+            return False
+        
+        song.url = cached.url
+        song.expires_at = cached.expires_at
+        song.codec = cached.acodec
+        song.title = cached.title or song.title
+        song.duration = cached.duration or song.duration
+        song.thumbnail = cached.thumbnail or song.thumbnail
+        song.is_lazy = False
+        
+        log_audio_event(0, "song_resolved_from_cache", song.title)
+        return True
     
     def _is_http_url(self, url: str) -> bool:
         """Check if string is an HTTP URL"""
@@ -366,23 +728,192 @@ class AudioManager:
         """Check if string is a Spotify URL"""
         return 'open.spotify.com' in url
     
-    async def create_audio_source(self, song: Song, guild_id: int) -> discord.AudioSource:
+    async def get_audio_source(self, song: Song, guild_id: int,
+                               on_advance: Optional[Callable] = None) -> discord.AudioSource:
+        """Source to play a song now - the pre-warmed one if it was prepared for this song
+        
+        With gapless/crossfade playback this starts a session that carries on
+        into the following songs by itself, calling on_advance(song) from the
+        audio thread each time it moves on.
+        """
+        source = self.prewarmer.take(guild_id, song)
+        if source is not None:
+            log_audio_event(guild_id, "playing_prewarmed_source", song.title)
+            self._consider_caching(song)
+        else:
+            source = await self.create_audio_source(song, guild_id, raw_pcm=self.continuous_playback)
+        
+        clock = self.telemetry.new_clock(guild_id, song.title)
+        if not self.continuous_playback:
+            tracked = TrackedSource(source, song, clock=clock)
+            self.now_playing[guild_id] = tracked
+            return tracked
+        
+        def advanced(next_song):
+            # Crossfades hand over with the head of the next song already played
+            tracked.restart(next_song, session.track_frames * TrackedSource.FRAME_SECONDS)
+            if on_advance:
+                on_advance(next_song)
+        
+        session = CrossfadeSource(song, source, config.crossfade_ms, on_advance=advanced)
+        self.playback_sessions[guild_id] = session
+        tracked = TrackedSource(make_volume_transformer(session, self.get_volume(guild_id)), song, clock=clock)
+        self.now_playing[guild_id] = tracked
+        return tracked
+    
+    def get_position(self, guild_id: int) -> Optional[float]:
+        """Seconds into the current song, or None if it isn't playing"""
+        tracked = self.now_playing.get(guild_id)
+        if tracked is None or tracked.song is not self.get_current_song(guild_id):
+            return None
+        return tracked.position
+    
+    def get_buffered_frames(self, guild_id: int) -> Optional[int]:
+        """Frames read ahead of the player for the current song, if its pipeline buffers"""
+        tracked = self.now_playing.get(guild_id)
+        return buffered_frames(tracked) if tracked is not None else None
+    
+    def get_playback_clock(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read-only playback timing for a guild: elapsed, buffering, underruns, first-packet latency"""
+        return self.telemetry.guild_snapshot(guild_id)
+    
+    async def seek(self, guild_id: int, voice_client, position: float) -> Optional[float]:
+        """Restart the current song's pipeline at `position` seconds
+        
+        Reuses the already-resolved stream URL (or cached file), so yt-dlp
+        only runs if the URL has expired. Returns the new position, or None
+        if nothing seekable is playing.
+        """
+        tracked = self.now_playing.get(guild_id)
+        song = self.get_current_song(guild_id)
+        if (not voice_client or not (voice_client.is_playing() or voice_client.is_paused())
+                or tracked is None or song is None or tracked.song is not song):
+            return None
+        
+        if song.duration:
+            position = min(position, max(0, song.duration - 1))
+        position = max(0.0, position)
+        
+        source = await self.create_audio_source(
+            song, guild_id, record_play=False, raw_pcm=self.continuous_playback, start_at=position
+        )
+        
+        # Playback may have moved on while the new pipeline was being built
+        if (self.get_current_song(guild_id) is not song or self.now_playing.get(guild_id) is not tracked
+                or tracked.song is not song
+                or not (voice_client.is_playing() or voice_client.is_paused())):
+            source.cleanup()
+            return None
+        
+        loop = asyncio.get_running_loop()
+        
+        session = self.playback_sessions.get(guild_id)
+        if self.continuous_playback and session is not None and session.active:
+            old = session.replace_current(source, int(position / TrackedSource.FRAME_SECONDS))
+            tracked.restart(song, position)
+        else:
+            new_tracked = TrackedSource(source, song, offset=position, clock=tracked.clock)
+            paused = voice_client.is_paused()
+            voice_client.source = new_tracked
+            if paused:
+                voice_client.pause()
+            self.now_playing[guild_id] = new_tracked
+            old = tracked
+        
+        # The audio thread may be mid-read on the old pipeline - stop it a moment later
+        loop.call_later(1.0, old.cleanup)
+        # The next track is now due duration - position from here
+        self.prewarmer.track_started(guild_id, song, position)
+        log_audio_event(guild_id, "seeked", f"{song.title} @ {position:.1f}s")
+        return position
+    
+    async def create_audio_source(self, song: Song, guild_id: int, record_play: bool = True,
+                                  prebuffer_frames: int = 0, raw_pcm: bool = False,
+                                  start_at: float = 0.0) -> discord.AudioSource:
         """Create discord audio source from song"""
-        if song.is_lazy:
-            song = await self.resolve_lazy_song(song)
+        volume = self.get_volume(guild_id)
+        
+        # Popular tracks may already be on disk - no resolution or streaming needed
+        cached_file = self.audio_cache.lookup(extract_video_id(song.webpage_url)) if self.audio_cache else None
+        if cached_file:
+            log_audio_event(guild_id, "playing_from_disk_cache", song.title)
+            return build_audio_source(
+                cached_file['path'], volume, codec=cached_file.get('acodec'),
+                is_local=True, prebuffer_frames=prebuffer_frames, raw_pcm=raw_pcm, start_at=start_at
+            )
+        
+        if song.is_stale():
+            song.mark_stale()
+        
+        if song.is_lazy and not self._apply_cached_stream(song):
+            song = await self.resolve_lazy_song(song, guild_id)
         
         if not song.url:
             raise ValueError(f"No playable URL found for {song.title}")
         
-        # Create FFmpeg source with optimized options
-        source = discord.FFmpegPCMAudio(song.url, **config.ffmpeg_options)
-        
-        # Apply volume
-        volume = self.get_volume(guild_id)
-        source = discord.PCMVolumeTransformer(source, volume=volume)
+        # Create FFmpeg source with optimized options and volume applied
+        source = build_audio_source(
+            song.url, volume, codec=song.codec, prebuffer_frames=prebuffer_frames,
+            raw_pcm=raw_pcm, start_at=start_at
+        )
         
+        if record_play:
+            self._consider_caching(song)
         return source
     
+    def _consider_caching(self, song: Song):
+        """Count a streamed play and download the track once it's popular enough"""
+        if not self.audio_cache:
+            return
+        
+        video_id = extract_video_id(song.webpage_url)
+        if not self.audio_cache.record_play(video_id):
+            return
+        if song.duration and song.duration > config.audio_cache_max_duration:
+            return  # Long mixes would eat the whole budget
+        
+        self.audio_cache.start_download(video_id)
+        asyncio.create_task(self._download_to_cache(video_id, song.webpage_url))
+    
+    async def _download_to_cache(self, video_id: str, page_url: str):
+        """Download a track into the disk cache in the background"""
+        try:
+            # Downloads hit YouTube like any extraction, so they share the breaker
+            result = await self._guarded_extract(
+                download_audio, (page_url, self.audio_cache.directory, video_id), 0, BACKGROUND
+            )
+            self.audio_cache.add(video_id, result)
+            await asyncio.get_running_loop().run_in_executor(None, self.audio_cache.save)
+            log_audio_event(0, "track_cached_to_disk", video_id)
+        except Exception as e:
+            self.audio_cache.download_failed(video_id)
+            logger.warning(f"Caching track {video_id} failed: {str(e)}")
+    
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Internal metrics for the audio pipeline, grouped by component"""
+        return {
+            'extraction_pool': self.extraction_pool.stats(),
+            'stream_cache': self.stream_cache.stats(),
+            'prefetch': self.prefetcher.stats(),
+            'prewarm': self.prewarmer.stats(),
+            'refresher': self.refresher.stats(),
+            'playback': self.telemetry.stats(),
+            'players': {
+                'guilds': len(self.players),
+                'pending_events': sum(player.pending for player in self.players.values()),
+                'processed_events': sum(player.processed for player in self.players.values()),
+                'stale_events': sum(player.stale for player in self.players.values()),
+            },
+            'event_bus': event_bus.stats(),
+            'timers': self.timers.stats(),
+            'circuit_breaker': self.breaker.stats(),
+            'negative_cache': self.negative_cache.stats(),
+            'ydl_pool': ydl_pool.stats(),
+            'match_cache': self.match_cache.stats(),
+            'coalescing': self.inflight.stats(),
+            'audio_cache': self.audio_cache.stats() if self.audio_cache else {'enabled': False},
+        }
+    
     # Auto-disconnect and timer management
     def is_bot_alone_in_vc(self, guild) -> bool:
         """Check if bot is alone in voice channel"""
@@ -396,52 +927,63 @@ class AudioManager:
         return len(human_members) == 0
     
     async def start_alone_timer(self, guild):
-        """Start timer to leave if bot stays alone"""
+        """Start (or restart) the timer to leave if bot stays alone"""
+        self.timers.arm((guild.id, ALONE), config.alone_timeout, lambda: self._alone_timeout(guild))
+    
+    async def _alone_timeout(self, guild):
+        """Alone timer fired: leave if still nobody is listening"""
         guild_id = guild.id
-        
-        # Cancel existing timer
-        if guild_id in self.alone_timers:
-            self.alone_timers[guild_id].cancel()
-        
-        async def alone_timer():
-            try:
-                await asyncio.sleep(config.alone_timeout)
+        try:
+            if self.is_bot_alone_in_vc(guild) and guild.voice_client:
+                # Find text channel to send message
+                text_channel = guild.system_channel
+                if not text_channel:
+                    for channel in guild.text_channels:
+                        if channel.permissions_for(guild.me).send_messages:
+                            text_channel = channel
+                            break
                 
-                if self.is_bot_alone_in_vc(guild) and guild.voice_client:
-                    # Find text channel to send message
-                    text_channel = guild.system_channel
-                    if not text_channel:
-                        for channel in guild.text_channels:
-                            if channel.permissions_for(guild.me).send_messages:
-                                text_channel = channel
-                                break
-                    
-                    # Disconnect and clean up
-                    await guild.voice_client.disconnect()
-                    self.clear_queue(guild_id)
-                    
-                    if text_channel:
-                        await text_channel.send(
-                            "🚪 Left voice channel - no one was listening. "
-                            "I'll be back when you need me! 👋"
-                        )
-                    
-                    log_audio_event(guild_id, "auto_disconnect_alone")
-                    
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.error("alone_timer", e, guild_id=guild_id)
-            finally:
-                self.alone_timers.pop(guild_id, None)
-        
-        self.alone_timers[guild_id] = asyncio.create_task(alone_timer())
+                # Disconnect and clean up
+                self.cancel_guild_timers(guild_id)
+                self.clear_queue(guild_id)
+                player = self.players.get(guild_id)
+                if player:
+                    player.next_generation()  # The disconnect's track-ended event is stale
+                await guild.voice_client.disconnect()
+                self.remove_player(guild_id)
+                
+                if text_channel:
+                    await text_channel.send(
+                        "🚪 Left voice channel - no one was listening. "
+                        "I'll be back when you need me! 👋"
+                    )
+                
+                log_audio_event(guild_id, "auto_disconnect_alone")
+                
+        except Exception as e:
+            logger.error("alone_timer", e, guild_id=guild_id)
     
     def cancel_alone_timer(self, guild_id: int):
         """Cancel the alone timer"""
-        if guild_id in self.alone_timers:
-            self.alone_timers[guild_id].cancel()
-            self.alone_timers.pop(guild_id, None)
+        self.timers.cancel((guild_id, ALONE))
+    
+    def start_idle_timer(self, guild_id: int, callback: Callable):
+        """Call callback after idle_timeout unless playback starts again first"""
+        self.timers.arm((guild_id, IDLE), config.idle_timeout, callback)
+    
+    def cancel_idle_timer(self, guild_id: int):
+        """Cancel the idle timer"""
+        self.timers.cancel((guild_id, IDLE))
+    
+    def start_retry_timer(self, guild_id: int, delay: float, callback: Callable):
+        """Call callback after delay to retry playback that had to be deferred"""
+        self.timers.arm((guild_id, RETRY), delay, callback)
+    
+    def cancel_guild_timers(self, guild_id: int):
+        """Cancel every timer of a guild (it left voice)"""
+        self.cancel_alone_timer(guild_id)
+        self.cancel_idle_timer(guild_id)
+        self.timers.cancel((guild_id, RETRY))
     
     async def validate_queue_songs(self, guild_id: int, max_check: int = 10) -> int:
         """Validate and clean up queue songs, return number of songs removed"""
@@ -449,31 +991,30 @@ class AudioManager:
         if not queue:
             return 0
         
-        removed_count = 0
         current_idx = self.guild_current_index.get(guild_id, 0)
         
         # Check a limited number of songs to avoid blocking
         check_count = min(max_check, len(queue))
         songs_to_remove = []
         
-        for i in range(check_count):
-            if i < len(queue):
-                song = queue[i]
-                # Skip currently playing song
-                if i == current_idx:
-                    continue
-                
-                # Check for obvious invalid songs
-                if (not song.title or song.title.lower() in ['deleted video', 'private video', 'unavailable'] or
-                    'deleted' in song.title.lower() or 'private' in song.title.lower()):
-                    songs_to_remove.append(i)
-        
-        # Remove invalid songs (in reverse order to maintain indices)
-        for idx in reversed(songs_to_remove):
-            self.remove_song(guild_id, idx)
-            removed_count += 1
-        
-        return removed_count
+        for i, song in enumerate(queue):
+            # Skip currently playing song
+            if i == current_idx:
+                continue
+            
+            # Known-unplayable lookups are cheap, so the whole queue gets pruned
+            if self.is_known_unplayable(song):
+                songs_to_remove.append(i)
+                continue
+            
+            # Check for obvious invalid songs
+            if i < check_count and (
+                not song.title or song.title.lower() in ['deleted video', 'private video', 'unavailable'] or
+                'deleted' in song.title.lower() or 'private' in song.title.lower()):
+                songs_to_remove.append(i)
+        
+        # Remove invalid songs in one go
+        return len(self.remove_songs(guild_id, songs_to_remove))
 
 
 # Global audio manager instance
@@ -0,0 +1,78 @@
+"""
+Spotify match cache for Music Bot
+Remembers which YouTube video each Spotify track resolved to, across guilds and restarts
+"""
+import time
+from typing import Any, Dict, Optional
+from utils.logger import logger
+from audio.persisted_index import PersistedIndex
+
+
+class MatchCache(PersistedIndex):
+    """Persistent Spotify track id / ISRC -> YouTube video index, stored as JSON"""
+
+    name = 'match_cache'
+    order_field = 'matched_at'  # Oldest matches are dropped first
+
+    def __init__(self, path: str, max_entries: int, save_delay: float = 30.0):
+        super().__init__(path, max_entries, save_delay)
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        """Load the index from disk"""
+        entries = self._read()
+        if entries is not None:
+            self._entries = entries
+            logger.info(f"Loaded {len(self._entries)} Spotify matches from {self.path}")
+
+    @staticmethod
+    def _keys(spotify_id: Optional[str], isrc: Optional[str]):
+        """Index keys for a track, most specific first"""
+        if spotify_id:
+            yield f"spotify:{spotify_id}"
+        if isrc:
+            yield f"isrc:{isrc.upper()}"
+
+    def get(self, spotify_id: Optional[str], isrc: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Look up the matched video for a track"""
+        keys = list(self._keys(spotify_id, isrc))
+        if not keys:
+            return None
+
+        for key in keys:
+            match = self._entries.get(key)
+            if match:
+                self.hits += 1
+                return match
+
+        self.misses += 1
+        return None
+
+    def record(self, spotify_id: Optional[str], isrc: Optional[str], video_id: str, info: Dict[str, Any]):
+        """Store the video a track resolved to"""
+        match = {
+            'video_id': video_id,
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'thumbnail': info.get('thumbnail'),
+            'matched_at': time.time(),
+        }
+        for key in self._keys(spotify_id, isrc):
+            self._entries[key] = match
+        self._schedule_save()
+
+    def forget(self, spotify_id: Optional[str], isrc: Optional[str] = None):
+        """Drop a match whose video no longer plays"""
+        for key in self._keys(spotify_id, isrc):
+            self._entries.pop(key, None)
+        self._schedule_save()
+
+    def stats(self) -> Dict[str, int]:
+        """Index size and hit/miss counters"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,109 @@
+"""
+Negative resolution cache for Music Bot
+Remembers videos and searches that can't be played, across guilds and restarts
+"""
+import time
+from typing import Dict, Optional
+from utils.logger import logger
+from audio.persisted_index import PersistedIndex
+from audio.circuit_breaker import UNAVAILABLE, PRIVATE, REGION_BLOCKED, AGE_RESTRICTED, NOT_FOUND
+
+# How long each failure class is trusted. Deleted videos stay deleted; a private
+# or region-blocked video can come back, and an empty search may find a new upload.
+FAILURE_TTLS = {
+    UNAVAILABLE: 7 * 24 * 3600,
+    PRIVATE: 24 * 3600,
+    REGION_BLOCKED: 24 * 3600,
+    AGE_RESTRICTED: 24 * 3600,
+    NOT_FOUND: 6 * 3600,
+}
+
+
+class KnownUnresolvableError(ValueError):
+    """The lookup failed recently for a reason that won't go away on a retry"""
+
+    def __init__(self, key: str, failure_class: str):
+        super().__init__(f"Known unplayable ({failure_class}): {key}")
+        self.key = key
+        self.failure_class = failure_class
+
+
+class NegativeCache(PersistedIndex):
+    """Persistent video id / normalized query -> failure class index with per-class TTLs, stored as JSON
+
+    Only failures that say something about the video or query itself are
+    kept (see FAILURE_TTLS); rate limiting, timeouts and unknown errors are
+    never cached.
+    """
+
+    name = 'negative_cache'
+    order_field = 'expires_at'  # Soonest to expire is dropped first
+
+    def __init__(self, path: str, max_entries: int, save_delay: float = 30.0):
+        super().__init__(path, max_entries, save_delay)
+        self.hits = 0
+        self.recorded = 0
+        self._load()
+
+    def _load(self):
+        """Load the index from disk, dropping entries that expired meanwhile"""
+        entries = self._read()
+        if entries is not None:
+            now = time.time()
+            self._entries = {key: entry for key, entry in entries.items() if entry.get('expires_at', 0) > now}
+            logger.info(f"Loaded {len(self._entries)} known-unplayable entries from {self.path}")
+
+    @staticmethod
+    def cacheable(failure_class: str) -> bool:
+        """Whether a failure class is worth remembering"""
+        return failure_class in FAILURE_TTLS
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        """Failure class recorded for a key, if it hasn't expired"""
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry['expires_at'] <= time.time():
+            del self._entries[key]
+            return None
+        self.hits += 1
+        return entry['failure']
+
+    def record(self, key: Optional[str], failure_class: str, reason: str = ''):
+        """Remember that a key failed; ignored for failure classes that aren't cacheable"""
+        if not key or not self.cacheable(failure_class):
+            return
+        now = time.time()
+        self._entries[key] = {
+            'failure': failure_class,
+            'reason': reason[:200],
+            'recorded_at': now,
+            'expires_at': now + FAILURE_TTLS[failure_class],
+        }
+        self.recorded += 1
+        self._schedule_save()
+
+    def forget(self, key: Optional[str]):
+        """Drop an entry (e.g. the video played after all)"""
+        if key and self._entries.pop(key, None) is not None:
+            self._schedule_save()
+
+    def _trim(self):
+        """Drop expired entries before trimming to size"""
+        now = time.time()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry['expires_at'] > now}
+        super()._trim()
+
+    def stats(self) -> Dict[str, int]:
+        """Index size and hit counters"""
+        by_class: Dict[str, int] = {}
+        for entry in self._entries.values():
+            by_class[entry['failure']] = by_class.get(entry['failure'], 0) + 1
+        return {
+            'entries': len(self._entries),
+            **{f'entries_{name}': count for name, count in sorted(by_class.items())},
+            'hits': self.hits,
+            'recorded': self.recorded,
+        }
@@ -0,0 +1,98 @@
+"""
+Persisted JSON index for Music Bot
+Shared save logic for the small key -> entry caches that survive restarts
+"""
+import asyncio
+import json
+import os
+from typing import Any, Dict, Optional
+from utils.logger import logger
+
+
+class PersistedIndex:
+    """A key -> entry dict stored as a JSON file
+
+    Changes are written a little later (``save_delay``) so bursts become
+    one write, off the event loop, through a temp file so a crash can't
+    leave a truncated index. When over ``max_entries`` the entries with
+    the smallest ``order_field`` are dropped on save.
+    """
+
+    # Prefix for error log contexts, e.g. "match_cache" -> "match_cache_save"
+    name = 'index'
+    order_field = ''
+
+    def __init__(self, path: str, max_entries: int, save_delay: float = 30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.save_delay = save_delay
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._save_task: Optional[asyncio.Task] = None
+
+    def _read(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read the index file; None if it is missing or unreadable"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.error(f"{self.name}_load", e)
+            return None
+
+    def _schedule_save(self):
+        """Write to disk a little later, so bursts of changes become one write"""
+        if self._save_task and not self._save_task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save()
+            return
+        self._save_task = loop.create_task(self._delayed_save())
+
+    async def _delayed_save(self):
+        """Save after the configured delay, writing the file off the event loop"""
+        try:
+            await asyncio.sleep(self.save_delay)
+            snapshot = self._snapshot()
+            await asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+        except asyncio.CancelledError:
+            pass
+
+    def _trim(self):
+        """Keep at most max_entries, dropping the lowest order_field first"""
+        if len(self._entries) > self.max_entries:
+            newest = sorted(self._entries.items(), key=lambda item: item[1].get(self.order_field, 0))
+            self._entries = dict(newest[-self.max_entries:])
+
+    def _snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Trim and copy the index for writing"""
+        self._trim()
+        return dict(self._entries)
+
+    def _save(self):
+        """Write the index synchronously"""
+        self._write(self._snapshot())
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]):
+        """Write an index snapshot to disk"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            # Write to a temp file first so a crash can't leave a truncated index
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+        except Exception as e:
+            logger.error(f"{self.name}_save", e)
+
+    def flush(self):
+        """Write any pending changes now (used on shutdown)"""
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+            self._save()
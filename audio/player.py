@@ -0,0 +1,113 @@
+"""
+Per-guild player for Music Bot
+Serializes playback transitions (track end, skip, jump, seek, stop, ...) through one event queue per guild
+"""
+import asyncio
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+from utils.logger import logger
+
+# Event kinds
+PLAY = 'play'
+TRACK_ENDED = 'track_ended'
+TRACK_ADVANCED = 'track_advanced'
+SKIP = 'skip'
+PREVIOUS = 'previous'
+JUMP = 'jump'
+STOP = 'stop'
+VOLUME = 'volume'
+SEEK = 'seek'
+
+
+@dataclass
+class PlayerEvent:
+    """Something that should change what a guild is playing"""
+    kind: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    # Events from the audio thread carry the generation of the playback they belong to
+    generation: Optional[int] = None
+    result: Optional[asyncio.Future] = None
+
+
+class GuildPlayer:
+    """Runs one guild's playback events one at a time on the event loop
+
+    Commands, buttons and discord.py's after-callback only post events;
+    the handler does the actual work. Every voice_client.play() starts a
+    new generation, so a "track ended" from playback that was already
+    replaced (skip, jump, stop) is recognised and dropped.
+    """
+
+    def __init__(self, guild_id: int, handler: Callable[['GuildPlayer', PlayerEvent], Awaitable[Any]]):
+        self.guild_id = guild_id
+        self.handler = handler
+        self.ctx = None  # Latest command context, used for replies and voice_client
+        self.generation = 0
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.processed = 0
+        self.stale = 0
+
+    def next_generation(self) -> int:
+        """Start a new playback generation, invalidating events from the previous one"""
+        self.generation += 1
+        return self.generation
+
+    def post(self, kind: str, generation: Optional[int] = None, **data) -> asyncio.Future:
+        """Queue an event; the returned future resolves to the handler's result"""
+        loop = asyncio.get_running_loop()
+        event = PlayerEvent(kind, data, generation, loop.create_future())
+        if self._closed:
+            # Late events (e.g. the after-callback of a disconnect) must not restart the player
+            event.result.set_result(None)
+            return event.result
+        self._events.put_nowait(event)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return event.result
+
+    def post_threadsafe(self, loop: asyncio.AbstractEventLoop, kind: str,
+                        generation: Optional[int] = None, **data):
+        """Queue an event from another thread (e.g. discord.py's audio thread) without waiting"""
+        if self._closed:
+            return
+        loop.call_soon_threadsafe(functools.partial(self.post, kind, generation, **data))
+
+    async def submit(self, kind: str, **data) -> Any:
+        """Queue an event and wait for it to be handled"""
+        return await self.post(kind, **data)
+
+    async def _run(self):
+        while True:
+            event = await self._events.get()
+            result = None
+            try:
+                if event.generation is not None and event.generation != self.generation:
+                    self.stale += 1
+                    continue
+                result = await self.handler(self, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("guild_player_event", e, guild_id=self.guild_id, event=event.kind)
+            finally:
+                self.processed += 1
+                if not event.result.done():
+                    event.result.set_result(result)
+
+    @property
+    def pending(self) -> int:
+        """Events waiting to be handled"""
+        return self._events.qsize()
+
+    def close(self):
+        """Stop handling events; anything posted afterwards is dropped"""
+        self._closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+        while not self._events.empty():
+            event = self._events.get_nowait()
+            if not event.result.done():
+                event.result.cancel()
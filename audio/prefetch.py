@@ -0,0 +1,91 @@
+"""
+Look-ahead prefetching for Music Bot
+Resolves upcoming lazy songs in the background so track changes don't wait on yt-dlp
+"""
+import asyncio
+from typing import Dict, List, Tuple
+from utils.logger import logger
+from audio.extraction import BACKGROUND
+
+
+class Prefetcher:
+    """Per-guild background resolver for the next few songs in the queue"""
+
+    def __init__(self, manager, depth: int, concurrency: int):
+        self.manager = manager
+        self.depth = depth
+        self._budget = asyncio.Semaphore(concurrency)
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._plans: Dict[int, Tuple[int, ...]] = {}
+
+    def _upcoming(self, guild_id: int) -> List:
+        """Songs after the current one that fall inside the look-ahead window"""
+        queue = self.manager.guild_queues.get(guild_id, [])
+        current_idx = self.manager.guild_current_index.get(guild_id, 0)
+        return queue[current_idx + 1:current_idx + 1 + self.depth]
+
+    def schedule(self, guild_id: int):
+        """(Re)plan prefetching for a guild after its queue order changed"""
+        if self.depth <= 0:
+            return
+
+        upcoming = self._upcoming(guild_id)
+        plan = tuple(id(song) for song in upcoming)
+
+        # Same songs in the same order - let the running plan carry on
+        task = self._tasks.get(guild_id)
+        if task and not task.done() and self._plans.get(guild_id) == plan:
+            return
+
+        self.cancel(guild_id)
+
+        if not any(song.is_lazy or song.is_stale() for song in upcoming):
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop yet (e.g. during startup), nothing to schedule on
+
+        self._plans[guild_id] = plan
+        self._tasks[guild_id] = loop.create_task(self._run(guild_id, upcoming))
+
+    def cancel(self, guild_id: int):
+        """Cancel any in-flight prefetching for a guild"""
+        task = self._tasks.pop(guild_id, None)
+        self._plans.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    async def _run(self, guild_id: int, upcoming: List):
+        """Resolve planned songs in queue order, within the global budget"""
+        try:
+            for song in upcoming:
+                async with self._budget:
+                    # Another path (e.g. playback itself) may have got there first
+                    if song.is_stale():
+                        song.mark_stale()
+                    if not song.is_lazy:
+                        continue
+
+                    try:
+                        await self.manager.resolve_lazy_song(song, guild_id, priority=BACKGROUND)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        # Playback will retry and report it if it's really unplayable
+                        logger.warning(f"Prefetch failed for '{song.title}': {str(e)}", guild_id=guild_id)
+
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._tasks.get(guild_id) is asyncio.current_task():
+                self._tasks.pop(guild_id, None)
+                self._plans.pop(guild_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of guilds with an active prefetch plan"""
+        return {
+            'active_guilds': sum(1 for task in self._tasks.values() if not task.done()),
+            'depth': self.depth,
+        }
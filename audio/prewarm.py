@@ -0,0 +1,197 @@
+"""
+Next-track pre-warming for Music Bot
+Spawns and pre-buffers the next song's FFmpeg pipeline shortly before the current one ends
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import discord
+from utils.logger import logger, log_audio_event
+from audio.sources import supports_live_volume
+
+
+@dataclass
+class _WarmSource:
+    """A ready-to-play source for a specific upcoming song"""
+    song: object
+    source: discord.AudioSource
+    volume: float
+    created_at: float
+    raw: bool = False
+
+
+class Prewarmer:
+    """Keeps at most one pre-started source per guild for the song that plays next"""
+
+    # A source held longer than this (long pause, stuck track) is not trusted to still stream
+    MAX_AGE = 120
+
+    def __init__(self, manager, lead: float, frames: int, enabled: bool = True):
+        self.manager = manager
+        self.lead = lead
+        self.frames = frames
+        self.enabled = enabled
+        self._warm: Dict[int, _WarmSource] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._warming: Dict[int, object] = {}
+        # Songs handed to a guild's gapless/crossfade session
+        self._offered: Dict[int, object] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def track_started(self, guild_id: int, song, position: float = 0.0):
+        """Arm the pre-warm for whatever follows the song that just started (or was seeked to position)"""
+        self.cancel(guild_id)
+        if not self.enabled or not song.duration:
+            return
+
+        # A crossfade starts early, so the next source has to be ready before it
+        lead = self.lead + self.manager.crossfade_seconds
+        delay = max(0.0, song.duration - position - lead)
+        loop = asyncio.get_running_loop()
+        self._timers[guild_id] = loop.call_later(delay, self._fire, guild_id)
+
+    def queue_changed(self, guild_id: int):
+        """Drop a warm source (or one being warmed) that is no longer for the next song"""
+        entry = self._warm.get(guild_id)
+        if entry and not self._wanted(guild_id, entry.song):
+            self._discard(guild_id)
+            self._start(guild_id)
+
+        task = self._tasks.get(guild_id)
+        if task and not task.done() and not self._wanted(guild_id, self._warming.get(guild_id)):
+            self._cancel_pending(guild_id)
+            self._start(guild_id)
+
+        offered = self._offered.get(guild_id)
+        if offered is not None and not self._wanted(guild_id, offered):
+            self._withdraw(guild_id)
+            self._start(guild_id)
+
+    def _wanted(self, guild_id: int, song) -> bool:
+        """Whether a warmed song is still the next one (or just became current and is about to be taken)"""
+        return song is not None and (
+            song is self.manager.peek_next_song(guild_id)
+            or song is self.manager.get_current_song(guild_id)
+        )
+
+    def take(self, guild_id: int, song) -> Optional[discord.AudioSource]:
+        """Hand over the warm source if it was prepared for this song"""
+        self._cancel_pending(guild_id)
+        entry = self._warm.pop(guild_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        volume = self.manager.get_volume(guild_id)
+        usable = (
+            entry.song is song
+            and time.monotonic() - entry.created_at < self.MAX_AGE
+            and (entry.raw or entry.volume == volume or supports_live_volume(entry.source))
+        )
+        if not usable:
+            self.discarded += 1
+            self.misses += 1
+            entry.source.cleanup()
+            return None
+
+        if supports_live_volume(entry.source):
+            entry.source.volume = volume
+        self.hits += 1
+        return entry.source
+
+    def cancel(self, guild_id: int):
+        """Stop any pending warm-up and release a warm source"""
+        self._cancel_pending(guild_id)
+        self._discard(guild_id)
+        self._withdraw(guild_id)
+
+    def _cancel_pending(self, guild_id: int):
+        timer = self._timers.pop(guild_id, None)
+        if timer:
+            timer.cancel()
+        task = self._tasks.pop(guild_id, None)
+        self._warming.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def _discard(self, guild_id: int):
+        entry = self._warm.pop(guild_id, None)
+        if entry:
+            self.discarded += 1
+            entry.source.cleanup()
+
+    def _withdraw(self, guild_id: int):
+        """Take back a next track offered to the guild's playback session"""
+        if self._offered.pop(guild_id, None) is None:
+            return
+        session = self.manager.playback_sessions.get(guild_id)
+        if session:
+            self.discarded += 1
+            session.withdraw()
+
+    def _fire(self, guild_id: int):
+        """Timer callback: the current track is about to end"""
+        self._timers.pop(guild_id, None)
+        self._start(guild_id)
+
+    def _start(self, guild_id: int):
+        """Begin warming the next song, unless we're still waiting for the lead window"""
+        if guild_id in self._timers or guild_id in self._warm or guild_id in self._tasks or guild_id in self._offered:
+            return
+
+        song = self.manager.peek_next_song(guild_id)
+        if song is None:
+            return
+
+        self._warming[guild_id] = song
+        self._tasks[guild_id] = asyncio.get_running_loop().create_task(self._run(guild_id, song))
+
+    async def _run(self, guild_id: int, song):
+        """Resolve the song and start its pipeline with a pre-buffer"""
+        raw = self.manager.continuous_playback
+        try:
+            volume = self.manager.get_volume(guild_id)
+            source = await self.manager.create_audio_source(
+                song, guild_id, record_play=False, prebuffer_frames=self.frames, raw_pcm=raw
+            )
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            # Playback will try again the normal way and report failures
+            logger.warning(f"Pre-warm failed for '{song.title}': {str(e)}", guild_id=guild_id)
+            return
+        finally:
+            if self._tasks.get(guild_id) is asyncio.current_task():
+                self._tasks.pop(guild_id, None)
+                self._warming.pop(guild_id, None)
+
+        if not self._wanted(guild_id, song):
+            source.cleanup()
+            self.discarded += 1
+            return
+
+        session = self.manager.playback_sessions.get(guild_id)
+        if raw and session is not None and session.active:
+            # Gapless/crossfade: the running session switches over by itself
+            session.offer(song, source)
+            self._offered[guild_id] = song
+            log_audio_event(guild_id, "next_track_offered", song.title)
+            return
+
+        self._warm[guild_id] = _WarmSource(song, source, volume, time.monotonic(), raw)
+        log_audio_event(guild_id, "next_track_prewarmed", song.title)
+
+    def stats(self) -> Dict[str, int]:
+        """Warm sources held and how often they were used"""
+        return {
+            'warm': len(self._warm),
+            'offered': len(self._offered),
+            'warming': sum(1 for task in self._tasks.values() if not task.done()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'discarded': self.discarded,
+        }
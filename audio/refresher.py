@@ -0,0 +1,114 @@
+"""
+Stream URL refresher for Music Bot
+Re-resolves queued songs whose stream URLs will expire before they get to play
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional
+from config import config
+from utils.logger import logger
+from audio.extraction import BACKGROUND
+from audio.stream_cache import stream_key
+
+
+class StreamRefresher:
+    """Periodic sweep over all queues that refreshes soon-to-expire resolved songs"""
+    
+    # Roughly how long a freshly resolved YouTube stream URL stays valid
+    URL_LIFETIME = 6 * 3600
+
+    def __init__(self, manager, interval: float, scan_depth: int, concurrency: int):
+        self.manager = manager
+        self.interval = interval
+        self.scan_depth = scan_depth
+        self._budget = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing = set()
+        self.refreshed = 0
+        self.failed = 0
+        self.sweeps = 0
+
+    def start(self):
+        """Start the sweep loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    def stop(self):
+        """Stop the sweep loop"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def _loop(self):
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.sweep()
+                except Exception as e:
+                    logger.error("stream_refresher_sweep", e)
+        except asyncio.CancelledError:
+            pass
+
+    def _due(self, guild_id: int) -> List:
+        """Upcoming resolved songs whose URL expires before they are expected to play"""
+        queue = self.manager.guild_queues.get(guild_id, [])
+        current_idx = self.manager.guild_current_index.get(guild_id, 0)
+        now = time.time()
+        # Anything expiring before the next sweep can't wait for it
+        slack = config.stream_expiry_margin + self.interval
+
+        # A URL refreshed now would expire again before songs further out play -
+        # those are left to be re-resolved when they come up
+        horizon = self.URL_LIFETIME - slack
+        
+        due = []
+        eta = 0.0  # Seconds until the song starts, counting the current one as nearly done
+        for song in queue[current_idx + 1:current_idx + 1 + self.scan_depth]:
+            if eta > horizon:
+                break
+            if not song.is_lazy and song.expires_at is not None and id(song) not in self._refreshing:
+                if song.expires_at - slack <= now + eta:
+                    due.append(song)
+            eta += song.duration or 0
+        return due
+
+    async def sweep(self) -> int:
+        """Refresh every due song across all guilds; returns how many were refreshed"""
+        self.sweeps += 1
+        jobs = [
+            self._refresh(guild_id, song)
+            for guild_id in list(self.manager.guild_queues)
+            for song in self._due(guild_id)
+        ]
+        if not jobs:
+            return 0
+        results = await asyncio.gather(*jobs)
+        return sum(1 for ok in results if ok)
+
+    async def _refresh(self, guild_id: int, song) -> bool:
+        """Re-resolve one song at background priority"""
+        self._refreshing.add(id(song))
+        try:
+            async with self._budget:
+                # Don't let resolution hand back the same soon-to-expire URL from the cache
+                self.manager.stream_cache.invalidate(stream_key(song.webpage_url))
+                song.mark_stale()
+                await self.manager.resolve_lazy_song(song, guild_id, priority=BACKGROUND)
+                self.refreshed += 1
+                return True
+        except Exception as e:
+            # The song stays stale, so playback resolves it afresh instead of failing in FFmpeg
+            self.failed += 1
+            logger.warning(f"Refreshing stream for '{song.title}' failed: {str(e)}", guild_id=guild_id)
+            return False
+        finally:
+            self._refreshing.discard(id(song))
+
+    def stats(self) -> Dict[str, int]:
+        """Sweep and refresh counters"""
+        return {
+            'sweeps': self.sweeps,
+            'refreshing': len(self._refreshing),
+            'refreshed': self.refreshed,
+            'failed': self.failed,
+        }
@@ -0,0 +1,63 @@
+"""
+Request coalescing for Music Bot
+Concurrent requests for the same key share one in-flight extraction
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Flight:
+    """An in-flight call and how many callers are waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single task"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Await factory() - or the identical call already in flight for key"""
+        flight = self._flights.get(key)
+        if flight is None:
+            self.misses += 1
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+        else:
+            self.hits += 1
+
+        flight.waiters += 1
+        try:
+            # Shielded so one caller giving up doesn't cancel it for the others
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Last one waiting - nobody wants the result any more
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def in_flight(self, key: str) -> bool:
+        """Whether a call for key is running right now"""
+        return key in self._flights
+
+    def _finish(self, key: str, flight: _Flight):
+        """Forget a finished call so the next request starts fresh"""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current in-flight calls"""
+        return {
+            'in_flight': len(self._flights),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
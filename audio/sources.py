@@ -0,0 +1,172 @@
+"""
+Audio source construction for Music Bot
+Builds the FFmpeg pipeline for a track, preferring Opus passthrough over PCM
+"""
+import threading
+import time
+from collections import deque
+import discord
+from typing import Optional
+from config import config
+from audio.volume import make_volume_transformer
+
+
+class PrebufferedSource(discord.AudioSource):
+    """Reads the first frames of a source on a helper thread before playback starts
+
+    FFmpeg has been spawned and connected and the head of the track is in
+    memory by the time the player asks for its first frame.
+    """
+
+    def __init__(self, original: discord.AudioSource, frames: int):
+        self.original = original
+        self.frames = frames
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._eof = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        for _ in range(self.frames):
+            with self._lock:
+                if self._closed or self._eof:
+                    return
+                data = self.original.read()
+                if not data:
+                    self._eof = True
+                    return
+                self._buffer.append(data)
+
+    @property
+    def buffered(self) -> int:
+        """Frames read ahead and not yet played"""
+        return len(self._buffer)
+
+    def read(self) -> bytes:
+        with self._lock:
+            if self._buffer:
+                return self._buffer.popleft()
+            if self._eof:
+                return b''
+            return self.original.read()
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self):
+        self._closed = True
+        self._buffer.clear()
+        self.original.cleanup()
+
+
+class TrackedSource(discord.AudioSource):
+    """Counts the frames handed to the player, so we know where in the song playback is"""
+
+    FRAME_SECONDS = 0.02
+
+    def __init__(self, original: discord.AudioSource, song, offset: float = 0.0, clock=None):
+        self.original = original
+        self.song = song
+        self.offset = offset
+        self.frames = 0
+        # Optional PlaybackClock that gets the timing of every read
+        self.clock = clock
+
+    @property
+    def position(self) -> float:
+        """Seconds into the song"""
+        return self.offset + self.frames * self.FRAME_SECONDS
+
+    def restart(self, song, offset: float = 0.0):
+        """Start counting for another song (gapless sessions switch songs in place)"""
+        self.song = song
+        self.offset = offset
+        self.frames = 0
+        if self.clock is not None:
+            self.clock.track_changed(song.title)
+
+    @property
+    def volume(self) -> float:
+        return self.original.volume
+
+    @volume.setter
+    def volume(self, value: float):
+        self.original.volume = value
+
+    def read(self) -> bytes:
+        if self.clock is None:
+            data = self.original.read()
+        else:
+            started = time.perf_counter()
+            data = self.original.read()
+            self.clock.on_read(started, time.perf_counter(), bool(data))
+        if data:
+            self.frames += 1
+        return data
+
+    def is_opus(self) -> bool:
+        return self.original.is_opus()
+
+    def cleanup(self):
+        self.original.cleanup()
+
+
+def buffered_frames(source: Optional[discord.AudioSource]) -> Optional[int]:
+    """Frames read ahead of the player somewhere in a source chain, if it has a read-ahead buffer"""
+    while source is not None:
+        if isinstance(source, PrebufferedSource):
+            return source.buffered
+        source = getattr(source, 'original', None) or getattr(source, 'current_source', None)
+    return None
+
+
+def build_audio_source(location: str, volume: float, codec: Optional[str] = None,
+                       is_local: bool = False, prebuffer_frames: int = 0,
+                       raw_pcm: bool = False, start_at: float = 0.0) -> discord.AudioSource:
+    """Create the playable source for a stream URL or local file
+
+    With Opus passthrough enabled, FFmpeg hands discord.py ready-made Opus
+    packets: the stream is copied as-is at unity volume, otherwise FFmpeg
+    applies the volume filter and encodes natively. Either way no per-frame
+    PCM work happens in Python.
+
+    ``prebuffer_frames`` starts reading the track ahead of playback (see
+    PrebufferedSource); volume is still applied after the buffer. ``raw_pcm``
+    returns plain PCM without volume, for sources that get mixed later.
+    ``start_at`` seeks the input, so no extra data is downloaded or decoded.
+    """
+    before_options = None if is_local else config.ffmpeg_options['before_options']
+    if start_at > 0:
+        before_options = f"-ss {start_at:.2f} {before_options or ''}".strip()
+    options = config.ffmpeg_options['options']
+
+    if config.opus_passthrough and not raw_pcm:
+        if codec == 'opus' and abs(volume - 1.0) < 0.005:
+            source = discord.FFmpegOpusAudio(
+                location,
+                codec='copy',
+                before_options=before_options,
+                options=options
+            )
+        else:
+            source = discord.FFmpegOpusAudio(
+                location,
+                bitrate=config.opus_bitrate,
+                before_options=before_options,
+                options=f"{options} -filter:a volume={volume:.2f}"
+            )
+        return PrebufferedSource(source, prebuffer_frames) if prebuffer_frames else source
+
+    source = discord.FFmpegPCMAudio(location, before_options=before_options, options=options)
+    if prebuffer_frames:
+        source = PrebufferedSource(source, prebuffer_frames)
+    return source if raw_pcm else make_volume_transformer(source, volume)
+
+
+def supports_live_volume(source: Optional[discord.AudioSource]) -> bool:
+    """Whether a playing source can change volume without rebuilding it"""
+    if isinstance(source, TrackedSource):
+        source = source.original
+    return isinstance(source, discord.PCMVolumeTransformer)
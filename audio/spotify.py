@@ -0,0 +1,137 @@
+"""
+Async Spotify client for Music Bot
+Non-blocking Web API access with a pooled HTTP session and cached access token
+"""
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import aiohttp
+from utils.logger import logger
+
+
+_SPOTIFY_URL_RE = re.compile(r'open\.spotify\.com/(?:intl-[\w-]+/)?(track|playlist|album)/([A-Za-z0-9]+)')
+
+# Only ask for the fields we use - playlist pages are much smaller this way
+_PLAYLIST_FIELDS = 'total,items(track(id,name,duration_ms,artists(name),external_ids))'
+
+
+def parse_spotify_url(url: str) -> Optional[Tuple[str, str]]:
+    """Split a Spotify URL into (kind, id), kind being track, playlist or album"""
+    match = _SPOTIFY_URL_RE.search(url)
+    return (match.group(1), match.group(2)) if match else None
+
+
+class SpotifyClient:
+    """Client-credentials Spotify Web API client built on aiohttp"""
+
+    TOKEN_URL = 'https://accounts.spotify.com/api/token'
+    API_URL = 'https://api.spotify.com/v1'
+    MAX_RETRIES = 3
+
+    def __init__(self, client_id: str, client_secret: str, concurrency: int = 4):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.concurrency = concurrency
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()
+        self._request_budget = asyncio.Semaphore(concurrency)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared HTTP session on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self._session
+
+    async def _get_token(self) -> str:
+        """Return a cached access token, fetching a new one shortly before it expires"""
+        async with self._token_lock:
+            if self._token and self._token_expires_at - 60 > time.time():
+                return self._token
+
+            async with self._get_session().post(
+                self.TOKEN_URL,
+                data={'grant_type': 'client_credentials'},
+                auth=aiohttp.BasicAuth(self.client_id, self.client_secret)
+            ) as response:
+                response.raise_for_status()
+                payload = await response.json()
+
+            self._token = payload['access_token']
+            self._token_expires_at = time.time() + payload.get('expires_in', 3600)
+            return self._token
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET an API path, refreshing the token on 401 and honouring 429 Retry-After"""
+        for attempt in range(self.MAX_RETRIES):
+            token = await self._get_token()
+            async with self._request_budget:
+                async with self._get_session().get(
+                    f"{self.API_URL}{path}",
+                    params=params,
+                    headers={'Authorization': f"Bearer {token}"}
+                ) as response:
+                    if response.status == 401:
+                        self._token = None
+                        continue
+                    if response.status == 429:
+                        retry_after = float(response.headers.get('Retry-After', '1'))
+                        logger.warning(f"Spotify rate limited, retrying in {retry_after}s", path=path)
+                        await asyncio.sleep(retry_after)
+                        continue
+                    response.raise_for_status()
+                    return await response.json()
+
+        raise RuntimeError(f"Spotify request failed after {self.MAX_RETRIES} attempts: {path}")
+
+    async def track(self, track_id: str) -> Dict[str, Any]:
+        """Fetch a single track"""
+        return await self._get(f"/tracks/{track_id}")
+
+    async def iter_tracks(self, kind: str, collection_id: str, limit: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield track pages of a playlist or album in order
+
+        The first page tells us the total; the remaining pages are then
+        fetched concurrently but still handed out in playlist order.
+        """
+        if kind == 'playlist':
+            path = f"/playlists/{collection_id}/tracks"
+            page_size = 100
+            extra = {'fields': _PLAYLIST_FIELDS}
+        else:
+            path = f"/albums/{collection_id}/tracks"
+            page_size = 50
+            extra = {}
+
+        def unwrap(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            # Playlist items wrap the track, album items are the track
+            tracks = [item.get('track') for item in items] if kind == 'playlist' else items
+            return [track for track in tracks if track and track.get('name')]
+
+        first = await self._get(path, {'limit': page_size, 'offset': 0, **extra})
+        yield unwrap(first.get('items', []))[:limit]
+
+        total = min(first.get('total', 0), limit)
+        tasks = [
+            asyncio.ensure_future(self._get(path, {'limit': page_size, 'offset': offset, **extra}))
+            for offset in range(page_size, total, page_size)
+        ]
+
+        try:
+            for offset, task in zip(range(page_size, total, page_size), tasks):
+                page = await task
+                yield unwrap(page.get('items', []))[:total - offset]
+        finally:
+            # Consumer stopped early (or a page failed) - don't leave requests running
+            for task in tasks:
+                task.cancel()
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,130 @@
+"""
+Resolved stream cache for Music Bot
+Keeps recently resolved stream URLs so repeats and replays skip yt-dlp
+"""
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+
+_YOUTUBE_ID_RE = re.compile(r'(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})')
+_EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+
+
+def extract_video_id(url: Optional[str]) -> Optional[str]:
+    """Extract the YouTube video id from a URL, if it is one"""
+    if not url:
+        return None
+    match = _YOUTUBE_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+def stream_key(url: Optional[str]) -> Optional[str]:
+    """Canonical cache key for a page URL (video id for YouTube, URL otherwise)"""
+    if not url or not url.startswith(('http://', 'https://')):
+        return None
+    video_id = extract_video_id(url)
+    if video_id:
+        return video_id
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{parsed.path}?{parsed.query}" if parsed.query else f"{parsed.netloc}{parsed.path}"
+
+
+def query_key(query: str) -> str:
+    """Normalized key for a URL or free-text search query"""
+    key = stream_key(query)
+    if key:
+        return key
+    return "search:" + " ".join(query.lower().split())
+
+
+def stream_expiry(url: Optional[str], default_ttl: int) -> float:
+    """Return the unix time a stream URL expires at, from its expire= parameter"""
+    if url:
+        match = _EXPIRE_RE.search(url)
+        if match:
+            return float(match.group(1))
+    return time.time() + default_ttl
+
+
+@dataclass
+class CachedStream:
+    """A resolved stream URL and the metadata that came with it"""
+    url: str
+    expires_at: float
+    title: Optional[str] = None
+    duration: Optional[int] = None
+    thumbnail: Optional[str] = None
+    webpage_url: Optional[str] = None
+    acodec: Optional[str] = None
+
+
+class StreamCache:
+    """LRU cache of resolved streams, keyed by canonical video id"""
+
+    def __init__(self, max_size: int, expiry_margin: int, default_ttl: int):
+        self.max_size = max_size
+        self.expiry_margin = expiry_margin
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[str, CachedStream]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Optional[str]) -> Optional[CachedStream]:
+        """Get a still-valid cached stream, or None"""
+        if not key:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at - self.expiry_margin <= time.time():
+            # Expired (or about to) - drop it so it gets re-resolved
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Optional[str], info: Dict[str, Any]) -> Optional[CachedStream]:
+        """Store a yt-dlp info dict under key, evicting the least recently used entry"""
+        if not key or not info or not info.get('url'):
+            return None
+
+        entry = CachedStream(
+            url=info['url'],
+            expires_at=stream_expiry(info['url'], self.default_ttl),
+            title=info.get('title'),
+            duration=info.get('duration'),
+            thumbnail=info.get('thumbnail'),
+            webpage_url=info.get('webpage_url'),
+            acodec=info.get('acodec'),
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return entry
+
+    def invalidate(self, key: Optional[str]):
+        """Drop a cached entry (e.g. after FFmpeg failed to open it)"""
+        if key:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit/miss counters"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
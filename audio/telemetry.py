@@ -0,0 +1,177 @@
+"""
+Playback telemetry for Music Bot
+Per-guild frame timing and event loop lag, to tell source, FFmpeg and event loop stutters apart
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from utils.logger import logger
+
+FRAME_SECONDS = 0.02
+PAUSE_SECONDS = 1.0
+
+
+class PlaybackClock:
+    """Frame timing for one guild's playing source
+
+    Written from the audio thread on every frame, read from the event loop.
+    A read that takes longer than a frame means the source (FFmpeg or the
+    stream behind it) couldn't keep up; a long gap between fast reads means
+    the player thread itself was starved (CPU, GIL, a busy event loop).
+    """
+
+    def __init__(self, song_title: str):
+        self.song_title = song_title
+        self.play_requested_at = time.perf_counter()
+        self.first_frame_at: Optional[float] = None
+        self.frames = 0
+        self.underruns = 0
+        self.late_frames = 0
+        self.max_read_ms = 0.0
+        self.max_gap_ms = 0.0
+        self._last_read_at: Optional[float] = None
+
+    def track_changed(self, song_title: str):
+        """A gapless session moved on to another song"""
+        self.song_title = song_title
+
+    def on_read(self, started: float, finished: float, ok: bool):
+        """Record one source read (perf_counter timestamps)"""
+        read_ms = (finished - started) * 1000
+        if ok:
+            self.frames += 1
+            if self.first_frame_at is None:
+                self.first_frame_at = finished
+        # Gaps longer than PAUSE_SECONDS are pauses, not stutters
+        gap = started - self._last_read_at if self._last_read_at is not None else 0.0
+        if gap > PAUSE_SECONDS:
+            gap = 0.0
+
+        if read_ms > FRAME_SECONDS * 1000:
+            self.underruns += 1
+        elif gap > FRAME_SECONDS * 2:
+            self.late_frames += 1
+
+        self.max_gap_ms = max(self.max_gap_ms, gap * 1000)
+        self.max_read_ms = max(self.max_read_ms, read_ms)
+        self._last_read_at = finished
+
+    @property
+    def first_packet_ms(self) -> Optional[float]:
+        """Time from handing the source to the player to its first frame"""
+        if self.first_frame_at is None:
+            return None
+        return (self.first_frame_at - self.play_requested_at) * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters as plain data"""
+        first_packet = self.first_packet_ms
+        return {
+            'song': self.song_title,
+            'frames': self.frames,
+            'underruns': self.underruns,
+            'late_frames': self.late_frames,
+            'max_read_ms': round(self.max_read_ms, 2),
+            'max_gap_ms': round(self.max_gap_ms, 2),
+            'first_packet_ms': round(first_packet, 1) if first_packet is not None else None,
+        }
+
+
+class PlaybackTelemetry:
+    """Per-guild playback clocks plus an event loop lag probe, snapshotted to disk for the dashboard"""
+
+    PROBE_INTERVAL = 0.5
+
+    def __init__(self, manager, snapshot_file: Optional[str], snapshot_interval: float):
+        self.manager = manager
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self.clocks: Dict[int, PlaybackClock] = {}
+        self.loop_lag_ms = 0.0
+        self.max_loop_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def new_clock(self, guild_id: int, song_title: str) -> PlaybackClock:
+        """Start timing a new source for a guild"""
+        clock = PlaybackClock(song_title)
+        self.clocks[guild_id] = clock
+        return clock
+
+    def forget(self, guild_id: int):
+        """Drop a guild's clock when it stops playing"""
+        self.clocks.pop(guild_id, None)
+
+    def guild_snapshot(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        """Read-only view of a guild's playback clock"""
+        clock = self.clocks.get(guild_id)
+        if clock is None:
+            return None
+
+        data = clock.snapshot()
+        data['elapsed'] = self.manager.get_position(guild_id)
+        data['buffered_frames'] = self.manager.get_buffered_frames(guild_id)
+        return data
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every playing guild plus event loop lag"""
+        return {
+            'timestamp': time.time(),
+            'loop_lag_ms': round(self.loop_lag_ms, 2),
+            'max_loop_lag_ms': round(self.max_loop_lag_ms, 2),
+            'guilds': {
+                str(guild_id): self.guild_snapshot(guild_id)
+                for guild_id in list(self.clocks)
+            },
+        }
+
+    def start(self):
+        """Start the loop lag probe and snapshot writer"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """Stop the background task"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_snapshot = loop.time() + self.snapshot_interval
+        try:
+            while True:
+                # How late the loop wakes us up is how long something else held it
+                expected = loop.time() + self.PROBE_INTERVAL
+                await asyncio.sleep(self.PROBE_INTERVAL)
+                self.loop_lag_ms = max(0.0, (loop.time() - expected) * 1000)
+                self.max_loop_lag_ms = max(self.max_loop_lag_ms, self.loop_lag_ms)
+
+                if self.snapshot_file and loop.time() >= next_snapshot:
+                    next_snapshot = loop.time() + self.snapshot_interval
+                    await loop.run_in_executor(None, self._write, self.snapshot())
+        except asyncio.CancelledError:
+            pass
+
+    def _write(self, data: Dict[str, Any]):
+        """Write a snapshot atomically"""
+        try:
+            directory = os.path.dirname(self.snapshot_file)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            tmp_path = f"{self.snapshot_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_file)
+        except Exception as e:
+            logger.error("playback_snapshot_write", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary for the metrics command"""
+        return {
+            'guilds_playing': len(self.clocks),
+            'underruns': sum(clock.underruns for clock in self.clocks.values()),
+            'late_frames': sum(clock.late_frames for clock in self.clocks.values()),
+            'loop_lag_ms': round(self.loop_lag_ms, 2),
+            'max_loop_lag_ms': round(self.max_loop_lag_ms, 2),
+        }
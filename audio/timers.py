@@ -0,0 +1,141 @@
+"""
+Timer wheel for Music Bot
+One hashed wheel drives every per-guild timeout (alone, idle) instead of a sleeping task each
+"""
+import asyncio
+import inspect
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set
+from utils.logger import logger
+
+# Timer kinds
+ALONE = 'alone'
+IDLE = 'idle'
+RETRY = 'retry'  # Deferred playback while extraction is paused
+
+
+class _Timer:
+    __slots__ = ('key', 'callback', 'slot', 'rounds')
+
+    def __init__(self, key: Hashable, callback: Callable, slot: int, rounds: int):
+        self.key = key
+        self.callback = callback
+        self.slot = slot
+        self.rounds = rounds
+
+
+class TimerWheel:
+    """Hashed timer wheel keyed by (guild_id, kind)
+
+    Timers land in one of ``slots`` buckets by deadline; a single driver
+    task advances one bucket per ``tick`` seconds and fires whatever is due
+    there. Arming, re-arming and cancelling are O(1), and re-arming a key
+    replaces its previous timer, so a guild never has two of the same kind.
+    The driver only runs while timers are armed. Timers fire within one
+    tick of their deadline.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self._wheel: List[Dict[Hashable, _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[Hashable, _Timer] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.fired = 0
+
+    def arm(self, key: Hashable, delay: float, callback: Callable[[], Any]):
+        """Call callback (sync or async) after delay seconds, replacing any timer with the same key"""
+        self.cancel(key)
+
+        ticks = max(1, -int(-delay // self.tick))  # Round up
+        slots = len(self._wheel)
+        # The bucket under the cursor was already processed for this revolution
+        slot = (self._cursor + ticks) % slots
+        timer = _Timer(key, callback, slot, (ticks - 1) // slots)
+        self._wheel[slot][key] = timer
+        self._timers[key] = timer
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def cancel(self, key: Hashable) -> bool:
+        """Disarm a timer; returns whether one was armed"""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        self._wheel[timer.slot].pop(key, None)
+        return True
+
+    def is_armed(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    @property
+    def armed(self) -> int:
+        """Number of timers waiting to fire"""
+        return len(self._timers)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while self._timers:
+                # Schedule against absolute tick times so a slow tick doesn't drift the wheel
+                next_tick += self.tick
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+                self._cursor = (self._cursor + 1) % len(self._wheel)
+                self._expire(self._wheel[self._cursor])
+        except asyncio.CancelledError:
+            pass
+
+    def _expire(self, bucket: Dict[Hashable, _Timer]):
+        """Fire the bucket's timers whose last revolution this is"""
+        due = []
+        for timer in bucket.values():
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                due.append(timer)
+
+        for timer in due:
+            # An earlier callback may have cancelled or re-armed this key
+            if self._timers.get(timer.key) is not timer:
+                continue
+            bucket.pop(timer.key, None)
+            self._timers.pop(timer.key, None)
+            self.fired += 1
+            try:
+                result = timer.callback()
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._running.add(task)
+                    task.add_done_callback(self._callback_done)
+            except Exception as e:
+                logger.error("timer_callback", e, timer=str(timer.key))
+
+    def _callback_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error("timer_callback", task.exception())
+
+    def stop(self):
+        """Disarm everything and stop the driver"""
+        self._timers.clear()
+        for bucket in self._wheel:
+            bucket.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+        for task in list(self._running):
+            task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        """Armed timers by kind"""
+        by_kind: Dict[str, int] = {}
+        for key in self._timers:
+            kind = key[1] if isinstance(key, tuple) else 'other'
+            by_kind[kind] = by_kind.get(kind, 0) + 1
+        return {
+            'armed': len(self._timers),
+            **{f'armed_{kind}': count for kind, count in sorted(by_kind.items())},
+            'fired': self.fired,
+            'running_callbacks': len(self._running),
+        }
@@ -0,0 +1,76 @@
+"""
+PCM volume control for Music Bot
+Vectorized gain for int16 PCM frames, with short ramps so volume changes don't click
+"""
+import discord
+from config import config
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional - fall back to discord.py's transformer
+    np = None
+
+
+# discord.py PCM frames: 20 ms of 48 kHz stereo int16
+CHANNELS = 2
+SAMPLES_PER_FRAME = 960
+MAX_GAIN = 2.0
+
+
+class NumpyVolumeTransformer(discord.PCMVolumeTransformer):
+    """Drop-in PCMVolumeTransformer that scales frames with NumPy
+
+    Volume changes ramp linearly over ``ramp_ms`` instead of jumping, and
+    unity gain passes frames through untouched.
+    """
+
+    def __init__(self, original: discord.AudioSource, volume: float = 1.0, ramp_ms: int = 60):
+        self._ramp_frames = max(1, ramp_ms // 20)
+        self._gain = min(max(volume, 0.0), MAX_GAIN)
+        self._target = self._gain
+        self._step = 0.0
+        # Per-sample position within a frame, reused to build ramp curves
+        self._ramp_shape = np.arange(SAMPLES_PER_FRAME, dtype=np.float32) / SAMPLES_PER_FRAME
+        super().__init__(original, volume=volume)
+
+    @property
+    def volume(self) -> float:
+        """Target volume; the applied gain follows it over a short ramp"""
+        return self._target
+
+    @volume.setter
+    def volume(self, value: float):
+        self._target = min(max(value, 0.0), MAX_GAIN)
+        self._step = (self._target - self._gain) / self._ramp_frames
+
+    def read(self) -> bytes:
+        data = self.original.read()
+        if not data:
+            return data
+
+        start = self._gain
+        if start != self._target:
+            end = start + self._step
+            if (self._step > 0 and end >= self._target) or (self._step < 0 and end <= self._target):
+                end = self._target
+            self._gain = end
+        elif start == 1.0:
+            return data
+
+        samples = np.frombuffer(data, dtype=np.int16).reshape(-1, CHANNELS)
+        if start != self._gain and len(samples) == SAMPLES_PER_FRAME:
+            # Ramp from the previous gain to the new one across the frame
+            gain = (start + (self._gain - start) * self._ramp_shape)[:, None]
+        else:
+            gain = np.float32(self._gain)
+
+        scaled = samples * gain
+        np.clip(scaled, -32768, 32767, out=scaled)
+        return scaled.astype(np.int16).tobytes()
+
+
+def make_volume_transformer(source: discord.AudioSource, volume: float) -> discord.PCMVolumeTransformer:
+    """Wrap a PCM source with volume control, vectorized when NumPy is available"""
+    if np is not None and config.numpy_volume:
+        return NumpyVolumeTransformer(source, volume=volume, ramp_ms=config.volume_ramp_ms)
+    return discord.PCMVolumeTransformer(source, volume=volume)
@@ -0,0 +1,128 @@
+"""
+YoutubeDL instance pool for Music Bot
+Keeps long-lived yt-dlp instances per option profile instead of building one per call
+"""
+import queue
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+import yt_dlp
+from config import config
+
+
+# Option profiles used by the bot
+SEARCH = 'search'
+SINGLE = 'single'
+PLAYLIST = 'playlist'
+FLAT = 'flat'
+
+
+def build_profile_options(profile: str) -> dict:
+    """Build yt-dlp options for a profile from the configured defaults"""
+    ydl_opts = config.ydl_options.copy()
+    ydl_opts['quiet'] = True
+
+    if profile in (SEARCH, SINGLE):
+        # A single lookup should fail loudly so the error can be classified
+        # (rate limited vs. deleted); playlists keep skipping broken entries
+        ydl_opts['ignoreerrors'] = 'only_download'
+        ydl_opts['noplaylist'] = True
+        if profile == SEARCH:
+            ydl_opts['default_search'] = 'ytsearch1'
+    elif profile in (PLAYLIST, FLAT):
+        ydl_opts['noplaylist'] = False
+        ydl_opts['extract_flat'] = 'in_playlist' if profile == FLAT else False
+        # Remove any single search constraints for playlists
+        ydl_opts.pop('default_search', None)
+        if profile == FLAT:
+            # Stubs are cheap, so flat listings can go far past the full-extraction cap
+            ydl_opts['playlistend'] = config.playlist_max_entries
+    else:
+        raise ValueError(f"Unknown yt-dlp profile: {profile}")
+
+    return ydl_opts
+
+
+class YoutubeDLPool:
+    """Thread-safe pool of YoutubeDL objects, one free-list per option profile"""
+
+    def __init__(self, max_idle: int, factory: Optional[Callable[[dict], yt_dlp.YoutubeDL]] = None):
+        self.max_idle = max_idle
+        self.factory = factory or yt_dlp.YoutubeDL
+        self._idle: Dict[str, "queue.LifoQueue[yt_dlp.YoutubeDL]"] = {}
+        self._options: Dict[str, dict] = {}
+        self.created = 0
+        self.reused = 0
+
+    def _free_list(self, profile: str) -> "queue.LifoQueue[yt_dlp.YoutubeDL]":
+        """Get (or create) the idle list for a profile"""
+        # setdefault is atomic under the GIL, so racing threads share one list
+        return self._idle.setdefault(profile, queue.LifoQueue())
+
+    def _new_instance(self, profile: str) -> yt_dlp.YoutubeDL:
+        """Build a fresh instance for a profile"""
+        if profile not in self._options:
+            self._options[profile] = build_profile_options(profile)
+        self.created += 1
+        return self.factory(dict(self._options[profile]))
+
+    @contextmanager
+    def checkout(self, profile: str, overrides: Optional[dict] = None) -> Iterator[yt_dlp.YoutubeDL]:
+        """Borrow an instance for the duration of a with-block
+
+        overrides are applied to the instance's params and restored afterwards,
+        for per-call settings such as playlist_items.
+        """
+        free_list = self._free_list(profile)
+        try:
+            ydl = free_list.get_nowait()
+            self.reused += 1
+        except queue.Empty:
+            ydl = self._new_instance(profile)
+
+        saved = {}
+        if overrides:
+            for key, value in overrides.items():
+                saved[key] = ydl.params.get(key)
+                ydl.params[key] = value
+
+        try:
+            yield ydl
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    ydl.params.pop(key, None)
+                else:
+                    ydl.params[key] = value
+
+            if free_list.qsize() >= self.max_idle:
+                self._close(ydl)
+            else:
+                free_list.put(ydl)
+
+    def _close(self, ydl: yt_dlp.YoutubeDL):
+        """Close an instance, saving its cookies"""
+        try:
+            ydl.__exit__(None, None, None)
+        except Exception:
+            pass
+
+    def close(self):
+        """Close every idle instance"""
+        for free_list in self._idle.values():
+            while True:
+                try:
+                    self._close(free_list.get_nowait())
+                except queue.Empty:
+                    break
+
+    def stats(self) -> Dict[str, int]:
+        """Instance counters"""
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'idle': sum(free_list.qsize() for free_list in self._idle.values()),
+        }
+
+
+# Per-process pool; in process mode each extraction worker builds its own
+ydl_pool = YoutubeDLPool(max_idle=config.ydl_pool_size)
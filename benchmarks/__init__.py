@@ -0,0 +1,4 @@
+"""
+Benchmarks for Music Bot
+Run from the project root, e.g. python -m benchmarks.bench_ydl_pool
+"""
@@ -0,0 +1,199 @@
+"""
+Benchmark: concurrent audio pipelines for N simulated guilds
+Builds sources the same way create_audio_source does (FFmpeg decode -> volume -> Opus)
+against local fixture files and paces them like discord.py's audio player, without
+connecting to Discord. Reports CPU%, RSS, frame jitter and the 20 ms deadline miss rate.
+
+Usage: python -m benchmarks.bench_pipeline [--guilds 1,10,50] [--seconds 20] [--mode opus|pcm|both]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import threading
+import time
+
+# config.py refuses to load without a token; the benchmark never connects
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+
+import discord
+from config import config
+from audio.sources import build_audio_source
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+FRAME_SECONDS = 0.02
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def ensure_fixture(seconds: int) -> str:
+    """Generate a stereo Opus/WebM test tone with FFmpeg, once"""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f'tone_{seconds}s.webm')
+    if not os.path.exists(path):
+        subprocess.run([
+            'ffmpeg', '-loglevel', 'error', '-y',
+            '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}:sample_rate=48000',
+            '-ac', '2', '-c:a', 'libopus', '-b:a', '128k', path
+        ], check=True)
+    return path
+
+
+class SimulatedGuild(threading.Thread):
+    """Reads one frame every 20 ms, like discord.py's AudioPlayer thread"""
+
+    def __init__(self, fixture: str, volume: float, frames: int, encode_pcm: bool):
+        super().__init__(daemon=True)
+        self.fixture = fixture
+        self.volume = volume
+        self.frames = frames
+        self.encoder = discord.opus.Encoder() if encode_pcm else None
+        self.completed_at = []
+        self.lateness = []
+        self.error = None
+
+    def run(self):
+        try:
+            source = build_audio_source(self.fixture, self.volume, codec='opus', is_local=True)
+        except Exception as e:
+            self.error = e
+            return
+
+        try:
+            start = time.perf_counter()
+            for loop in range(1, self.frames + 1):
+                data = source.read()
+                if not data:
+                    break
+                if self.encoder is not None and not source.is_opus():
+                    self.encoder.encode(data, self.encoder.SAMPLES_PER_FRAME)
+
+                now = time.perf_counter()
+                deadline = start + FRAME_SECONDS * loop
+                self.completed_at.append(now)
+                self.lateness.append(now - deadline)
+                if deadline > now:
+                    time.sleep(deadline - now)
+        finally:
+            source.cleanup()
+
+
+class ResourceSampler(threading.Thread):
+    """Samples CPU% and RSS of this process plus its FFmpeg children"""
+
+    def __init__(self, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.cpu = []
+        self.rss = []
+        self._stop_event = threading.Event()
+        self._procs = {}
+
+    def _tracked(self):
+        me = psutil.Process()
+        for proc in [me] + me.children(recursive=True):
+            if proc.pid not in self._procs:
+                proc.cpu_percent(None)  # prime the counter
+                self._procs[proc.pid] = proc
+        return list(self._procs.values())
+
+    def run(self):
+        if psutil is None:
+            return
+        self._tracked()
+        while not self._stop_event.wait(self.interval):
+            cpu = rss = 0.0
+            for proc in self._tracked():
+                try:
+                    cpu += proc.cpu_percent(None)
+                    rss += proc.memory_info().rss
+                except psutil.NoSuchProcess:
+                    self._procs.pop(proc.pid, None)
+            self.cpu.append(cpu)
+            self.rss.append(rss)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_case(fixture: str, guilds: int, seconds: int, mode: str, volume: float) -> dict:
+    """Run `guilds` pipelines for `seconds` and summarize them"""
+    config.opus_passthrough = mode == 'opus'
+    encode_pcm = mode == 'pcm' and discord.opus.is_loaded()
+    frames = int(seconds / FRAME_SECONDS)
+
+    sampler = ResourceSampler()
+    sampler.start()
+    workers = [SimulatedGuild(fixture, volume, frames, encode_pcm) for _ in range(guilds)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    sampler.stop()
+
+    errors = [w.error for w in workers if w.error]
+    lateness = [late for w in workers for late in w.lateness]
+    jitter = []
+    for w in workers:
+        intervals = [b - a for a, b in zip(w.completed_at, w.completed_at[1:])]
+        if len(intervals) > 1:
+            jitter.append(statistics.pstdev(intervals) * 1000)
+
+    lateness.sort()
+    produced = len(lateness)
+    return {
+        'mode': mode,
+        'guilds': guilds,
+        'seconds': seconds,
+        'opus_encode': mode == 'opus' or encode_pcm,
+        'errors': len(errors),
+        'frames': produced,
+        'cpu_percent': round(statistics.mean(sampler.cpu), 1) if sampler.cpu else None,
+        'rss_mb': round(max(sampler.rss) / 1024 / 1024, 1) if sampler.rss else None,
+        'jitter_ms': round(statistics.mean(jitter), 3) if jitter else None,
+        'late_p99_ms': round(lateness[int(produced * 0.99) - 1] * 1000, 3) if produced else None,
+        'deadline_miss_pct': round(sum(1 for late in lateness if late > 0) / produced * 100, 3) if produced else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--guilds', default='1,10,25', help='comma-separated guild counts')
+    parser.add_argument('--seconds', type=int, default=20, help='audio seconds per guild')
+    parser.add_argument('--mode', choices=['opus', 'pcm', 'both'], default='both')
+    parser.add_argument('--volume', type=float, default=0.5)
+    parser.add_argument('--fixture', help='audio file to play instead of the generated tone')
+    parser.add_argument('--json', help='append results to this JSON lines file')
+    args = parser.parse_args()
+
+    fixture = args.fixture or ensure_fixture(args.seconds + 5)
+    modes = ['opus', 'pcm'] if args.mode == 'both' else [args.mode]
+    if 'pcm' in modes and not discord.opus.is_loaded():
+        try:
+            discord.opus._load_default()
+        except Exception:
+            pass
+        if not discord.opus.is_loaded():
+            print("libopus not found - the pcm runs measure decode and volume only")
+    if psutil is None:
+        print("psutil not installed - CPU and RSS are not reported")
+
+    print(f"{'mode':<6}{'guilds':>7}{'cpu%':>8}{'rss MB':>9}{'jitter ms':>11}{'p99 late ms':>13}{'miss %':>9}{'errors':>8}")
+    for mode in modes:
+        for guilds in (int(n) for n in args.guilds.split(',')):
+            result = run_case(fixture, guilds, args.seconds, mode, args.volume)
+            print(f"{mode:<6}{guilds:>7}{result['cpu_percent'] or '-':>8}{result['rss_mb'] or '-':>9}"
+                  f"{result['jitter_ms'] or '-':>11}{result['late_p99_ms'] if result['late_p99_ms'] is not None else '-':>13}"
+                  f"{result['deadline_miss_pct'] if result['deadline_miss_pct'] is not None else '-':>9}{result['errors']:>8}")
+            if args.json:
+                with open(args.json, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'timestamp': time.time(), **result}) + '\n')
+
+
+if __name__ == '__main__':
+    main()
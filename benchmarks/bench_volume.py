@@ -0,0 +1,73 @@
+"""
+Benchmark: CPU cost of PCM volume scaling, stock transformer vs NumPy
+Feeds pre-generated 20 ms stereo frames, so it runs offline without FFmpeg
+
+Usage: python -m benchmarks.bench_volume [frames]
+"""
+import os
+import random
+import sys
+import time
+
+# config.py refuses to load without a token; the benchmark never connects
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+
+import discord
+from audio.volume import NumpyVolumeTransformer, CHANNELS, SAMPLES_PER_FRAME
+
+FRAME_MS = 20
+
+
+class FakePCM(discord.AudioSource):
+    """Cycles through a handful of noise frames"""
+
+    def __init__(self, frames: int):
+        rng = random.Random(0)
+        self._pool = [
+            bytes(rng.getrandbits(8) for _ in range(SAMPLES_PER_FRAME * CHANNELS * 2))
+            for _ in range(8)
+        ]
+        self._remaining = frames
+
+    def read(self) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        self._remaining -= 1
+        return self._pool[self._remaining % len(self._pool)]
+
+    def is_opus(self) -> bool:
+        return False
+
+
+def bench(transformer_cls, frames: int, change_every: int = 0) -> float:
+    """CPU seconds to read `frames` frames, optionally changing volume periodically"""
+    source = transformer_cls(FakePCM(frames), volume=0.5)
+    start = time.process_time()
+    for i in range(frames):
+        if change_every and i % change_every == 0:
+            source.volume = 0.3 if source.volume > 0.4 else 0.8
+        source.read()
+    return time.process_time() - start
+
+
+def report(label: str, seconds: float, frames: int):
+    per_frame = seconds / frames * 1000
+    # One stream reads one frame every 20 ms, so this is CPU share per stream
+    print(f"{label:<28}{per_frame * 1000:9.1f} us/frame  {per_frame / FRAME_MS * 100:6.3f}% CPU/stream")
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    # Warm up
+    bench(discord.PCMVolumeTransformer, 200)
+    bench(NumpyVolumeTransformer, 200)
+
+    print(f"frames: {frames} ({frames * FRAME_MS / 1000:.0f}s of audio)")
+    report("stock transformer", bench(discord.PCMVolumeTransformer, frames), frames)
+    report("numpy transformer", bench(NumpyVolumeTransformer, frames), frames)
+    report("numpy, ramping every 1s", bench(NumpyVolumeTransformer, frames, change_every=50), frames)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark: per-call yt-dlp overhead with and without the YoutubeDL pool
+Uses a local fake extractor, so it runs offline and measures only yt-dlp setup cost
+
+Usage: python -m benchmarks.bench_ydl_pool [calls]
+"""
+import os
+import sys
+import time
+
+# config.py refuses to load without a token; the benchmark never connects
+os.environ.setdefault('DISCORD_TOKEN', 'benchmark')
+
+import yt_dlp
+from yt_dlp.extractor.common import InfoExtractor
+from audio.ydl_pool import YoutubeDLPool, build_profile_options, SINGLE
+
+
+class FakeIE(InfoExtractor):
+    """Returns a canned opus stream for fake://<id> without touching the network"""
+    _VALID_URL = r'fake://(?P<id>.+)'
+
+    def _real_extract(self, url):
+        video_id = self._match_id(url)
+        return {
+            'id': video_id,
+            'title': f'Fake track {video_id}',
+            'url': f'https://example.invalid/{video_id}.webm?expire=4102444800',
+            'ext': 'webm',
+            'acodec': 'opus',
+            'vcodec': 'none',
+            'duration': 180,
+        }
+
+
+def make_ydl(opts: dict) -> yt_dlp.YoutubeDL:
+    """Build a YoutubeDL that knows about the fake extractor"""
+    ydl = yt_dlp.YoutubeDL(opts)
+    ydl.add_info_extractor(FakeIE())
+    return ydl
+
+
+def bench_fresh(calls: int) -> float:
+    """Old behaviour: a new YoutubeDL per extraction"""
+    opts = build_profile_options(SINGLE)
+    start = time.perf_counter()
+    for i in range(calls):
+        with make_ydl(dict(opts)) as ydl:
+            ydl.extract_info(f'fake://{i}', download=False, ie_key='Fake')
+    return time.perf_counter() - start
+
+
+def bench_pooled(calls: int) -> float:
+    """New behaviour: instances borrowed from the pool"""
+    pool = YoutubeDLPool(max_idle=1, factory=make_ydl)
+    start = time.perf_counter()
+    for i in range(calls):
+        with pool.checkout(SINGLE) as ydl:
+            ydl.extract_info(f'fake://{i}', download=False, ie_key='Fake')
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return elapsed
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # Warm up imports and lazy extractor loading so neither side pays for them
+    bench_fresh(5)
+    bench_pooled(5)
+
+    fresh = bench_fresh(calls)
+    pooled = bench_pooled(calls)
+
+    print(f"calls:            {calls}")
+    print(f"fresh instance:   {fresh / calls * 1000:8.3f} ms/call")
+    print(f"pooled instance:  {pooled / calls * 1000:8.3f} ms/call")
+    print(f"speedup:          {fresh / pooled:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,10 @@ from discord.ext import commands
 from config import config
 from utils.logger import logger
 from audio.manager import audio_manager
+from audio.ydl_pool import ydl_pool
+from utils.event_bus import event_bus, SONG_STARTED, QUEUE_CHANGED
+from utils.stats_manager import stats_manager
+from ui.views import ui_manager
 
 
 class MusicBot(commands.Bot):
@@ -37,6 +41,15 @@ class MusicBot(commands.Bot):
             await self.load_extension('commands.music')
             await self.load_extension('commands.admin')
             
+            # Keep queued stream URLs fresh in the background
+            audio_manager.refresher.start()
+            audio_manager.telemetry.start()
+            
+            # Stats and UI follow playback through the event bus instead of holding it up
+            event_bus.subscribe(SONG_STARTED, stats_manager.on_song_started)
+            event_bus.subscribe(SONG_STARTED, ui_manager.request_update)
+            event_bus.subscribe(QUEUE_CHANGED, ui_manager.request_update)
+            
             logger.info("All command modules loaded successfully")
             logger.info("Bot setup completed successfully")
             
@@ -102,7 +115,7 @@ class MusicBot(commands.Bot):
         # Clean up guild data
         try:
             audio_manager.clear_queue(guild.id)
-            audio_manager.cancel_alone_timer(guild.id)
+            audio_manager.cancel_guild_timers(guild.id)
             
         except Exception as e:
             logger.error("guild_leave_cleanup", e, guild_id=guild.id)
@@ -175,9 +188,24 @@ class MusicBot(commands.Bot):
             for guild in self.guilds:
                 if guild.voice_client:
                     audio_manager.clear_queue(guild.id)
-                    audio_manager.cancel_alone_timer(guild.id)
+                    audio_manager.cancel_guild_timers(guild.id)
                     await guild.voice_client.disconnect()
             
+            audio_manager.refresher.stop()
+            audio_manager.telemetry.stop()
+            audio_manager.timers.stop()
+            # Let queued events reach their subscribers (stats) before the final flush
+            await event_bus.drain()
+            event_bus.stop()
+            await stats_manager.flush()
+            audio_manager.extraction_pool.shutdown()
+            audio_manager.match_cache.flush()
+            audio_manager.negative_cache.flush()
+            if audio_manager.audio_cache:
+                audio_manager.audio_cache.save()
+            if audio_manager.spotify_client:
+                await audio_manager.spotify_client.close()
+            ydl_pool.close()
             logger.info("Bot shutdown completed")
             
         except Exception as e:
@@ -231,7 +259,10 @@ async def help_command(ctx):
         name="🔧 **Audio & Settings**",
         value=(
             "`volume <0.1-2.0>` — Set playback volume\n"
+            "`seek <time>` — Jump to a time in the song (e.g. `1:30`)\n"
+            "`forward [sec]` / `rewind [sec]` — Skip ahead / back (default 10s)\n"
             "`stats` — Show server song statistics (Admin)\n"
+            "`audiostats` — Show audio pipeline metrics (Admin)\n"
             "`forceleave` — Force disconnect (Admin)\n"
         ),
         inline=False
@@ -8,6 +8,8 @@ from config import config
 from utils.logger import logger, log_command_usage
 from utils.stats_manager import stats_manager
 from audio.manager import audio_manager
+from audio.player import STOP, VOLUME
+from commands.music import get_player
 
 
 class AdminCog(commands.Cog):
@@ -36,11 +38,8 @@ class AdminCog(commands.Cog):
             return
         
         try:
-            audio_manager.set_volume(ctx.guild.id, volume)
-            
             # Apply to current source if playing
-            if ctx.voice_client and ctx.voice_client.source:
-                ctx.voice_client.source.volume = volume
+            await get_player(ctx).submit(VOLUME, volume=volume)
             
             await ctx.send(f"✅ Default volume set to: **{volume}** (session only)\n"
                           "ℹ️ **Note:** Volume settings are no longer persistent and will reset when the bot restarts.")
@@ -55,7 +54,8 @@ class AdminCog(commands.Cog):
         log_command_usage(ctx, "stats")
         
         try:
-            # Get server-specific stats
+            # Get server-specific stats, including plays still waiting to be written
+            await stats_manager.flush()
             server_stats = await stats_manager.get_server_stats(ctx.guild.id)
             top_songs = await stats_manager.get_server_top_songs(ctx.guild.id, 5)
             queue = audio_manager.get_queue(ctx.guild.id)
@@ -119,6 +119,34 @@ class AdminCog(commands.Cog):
             logger.error("stats_command", e, guild_id=ctx.guild.id)
             await ctx.send("❌ Failed to fetch statistics. Please try again.")
 
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def audiostats(self, ctx):
+        """Show internal audio pipeline metrics"""
+        log_command_usage(ctx, "audiostats")
+        
+        try:
+            metrics = audio_manager.get_metrics()
+            
+            embed = discord.Embed(
+                title="⚙️ Audio Pipeline Metrics",
+                color=0x2b2d31
+            )
+            
+            for component, values in metrics.items():
+                lines = "\n".join(f"{key}: **{value}**" for key, value in values.items())
+                embed.add_field(
+                    name=component.replace('_', ' ').title(),
+                    value=lines or "No data",
+                    inline=True
+                )
+            
+            await ctx.send(embed=embed)
+            
+        except Exception as e:
+            logger.error("audiostats_command", e, guild_id=ctx.guild.id)
+            await ctx.send("❌ Failed to fetch audio metrics. Please try again.")
+
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def forceleave(self, ctx):
@@ -127,12 +155,13 @@ class AdminCog(commands.Cog):
         
         try:
             # Clean up everything
-            audio_manager.clear_queue(ctx.guild.id)
-            audio_manager.cancel_alone_timer(ctx.guild.id)
+            await get_player(ctx).submit(STOP)
+            audio_manager.cancel_guild_timers(ctx.guild.id)
             
             # Disconnect from voice
             if ctx.voice_client:
                 await ctx.voice_client.disconnect()
+                audio_manager.remove_player(ctx.guild.id)
                 await ctx.send("🚪 **Force disconnected** from voice channel and cleared all data")
             else:
                 await ctx.send("ℹ️ Not currently in a voice channel, but cleared all data anyway")
@@ -155,10 +184,7 @@ class AdminCog(commands.Cog):
                 return
             
             # Stop current song and clear queue
-            if ctx.voice_client and (ctx.voice_client.is_playing() or ctx.voice_client.is_paused()):
-                ctx.voice_client.stop()
-            
-            audio_manager.clear_queue(ctx.guild.id)
+            await get_player(ctx).submit(STOP)
             
             await ctx.send(f"🗑️ **Cleared queue** - Removed {queue_size} songs")
             
@@ -195,6 +221,14 @@ class AdminCog(commands.Cog):
             logger.error("stats_error", error, guild_id=ctx.guild.id)
             await ctx.send("❌ An error occurred while fetching statistics.")
 
+    @audiostats.error
+    async def audiostats_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("❌ You need administrator permissions to view audio metrics!")
+        else:
+            logger.error("audiostats_error", error, guild_id=ctx.guild.id)
+            await ctx.send("❌ An error occurred while fetching audio metrics.")
+
     @forceleave.error
     async def forceleave_error(self, ctx, error):
         if isinstance(error, commands.MissingPermissions):
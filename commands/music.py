@@ -5,12 +5,17 @@ Handles all music-related commands and playback
 import asyncio
 import discord
 from discord.ext import commands
-import yt_dlp
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from config import config
 from utils.logger import logger, log_command_usage, log_audio_event
-from utils.stats_manager import stats_manager
+from utils.event_bus import event_bus, SONG_STARTED, QUEUE_CHANGED
 from audio.manager import audio_manager, Song
+from audio.stream_cache import stream_key, stream_expiry
+from audio.extraction import extract_entries, entry_page_url, entry_thumbnail
+from audio.ydl_pool import SEARCH, SINGLE
+from audio.circuit_breaker import CircuitOpenError
+from audio.negative_cache import KnownUnresolvableError
+from audio.player import GuildPlayer, PlayerEvent, PLAY, TRACK_ENDED, TRACK_ADVANCED, SKIP, PREVIOUS, JUMP, STOP, VOLUME, SEEK
 from ui.views import ui_manager
 
 
@@ -69,8 +74,8 @@ class MusicCog(commands.Cog):
         
         try:
             # Show processing message for potential playlists
-            is_potential_playlist = ('list=' in query or 'playlist' in query.lower() or 
-                                   audio_manager._is_spotify_url(query))
+            # Only real playlist/Spotify links - a search like "lofi playlist" is a plain search
+            is_potential_playlist = self._is_playlist_url(query) or audio_manager._is_spotify_url(query)
             
             processing_msg = None
             if is_potential_playlist:
@@ -81,7 +86,7 @@ class MusicCog(commands.Cog):
                 await self._process_playlist_batch(ctx, query, processing_msg)
             else:
                 # Single song processing (fast)
-                songs = await self._process_query(query, ctx.author.id)
+                songs = await self._process_query(query, ctx.author.id, ctx.guild.id)
                 
                 if not songs:
                     await ctx.send("❌ Couldn't find anything to play with that query.")
@@ -91,8 +96,7 @@ class MusicCog(commands.Cog):
                 queue_position = audio_manager.add_songs(ctx.guild.id, songs)
                 
                 # Start playing if nothing is currently playing
-                if not ctx.voice_client.is_playing() and not ctx.voice_client.is_paused():
-                    await play_current_song(ctx)
+                await get_player(ctx).submit(PLAY)
                 
                 # Send feedback to user
                 song = songs[0]
@@ -102,160 +106,137 @@ class MusicCog(commands.Cog):
                     await ctx.send(f"➕ Iske baad ye bajega: **{song.title}**")
                 
                 # Update UI
-                await ui_manager.update_all_ui(ctx)
+                event_bus.publish(QUEUE_CHANGED, ctx=ctx)
                 
                 log_audio_event(ctx.guild.id, "songs_added", f"{len(songs)} songs")
             
         except Exception as e:
             logger.error("play_command", e, guild_id=ctx.guild.id, user_id=ctx.author.id)
             error_msg = str(e)
-            if "Spotify support is not configured" in error_msg:
+            if isinstance(e, KnownUnresolvableError):
+                await ctx.send("❌ Couldn't find anything to play with that query.")
+            elif isinstance(e, CircuitOpenError):
+                await ctx.send(f"⏳ YouTube is rate-limiting requests right now. Try again in about {e.retry_after:.0f}s.")
+            elif "Spotify support is not configured" in error_msg:
                 await ctx.send("❌ Spotify integration is not configured. Please set up SPOTIFY_CLIENT_ID and SPOTIPY_CLIENT_SECRET environment variables.")
             elif "playlist" in error_msg.lower():
                 await ctx.send(f"❌ Error processing playlist: {error_msg}")
             else:
                 await ctx.send(f"❌ An error occurred while processing your request: {error_msg}")
     
-    async def _process_query(self, query: str, user_id: int) -> List[Song]:
+    async def _process_query(self, query: str, user_id: int, guild_id: int = 0) -> List[Song]:
         """Process user query and return list of songs"""
+        # Spotify links and playlists: collect every page
+        if audio_manager._is_spotify_url(query) or self._is_playlist_url(query):
+            return [song async for page in self._iter_playlist(query, user_id, guild_id) for song in page]
+        
+        # Handle single YouTube/other URLs and search queries
+        profile = SINGLE if audio_manager._is_http_url(query) else SEARCH
+        
+        # Run on the extraction pool to avoid blocking
+        entries = await audio_manager.extract(extract_entries, query, profile, guild_id=guild_id)
+        
+        return self._songs_from_entries(entries, user_id, is_playlist=False)
+    
+    def _is_playlist_url(self, query: str) -> bool:
+        """Check if a query is a (non-Spotify) playlist URL"""
+        return audio_manager._is_http_url(query) and ('list=' in query or 'playlist' in query.lower())
+    
+    def _songs_from_entries(self, entries: List[dict], user_id: int, is_playlist: bool) -> List[Song]:
+        """Build songs from yt-dlp entries"""
         songs = []
         
-        # Handle Spotify URLs
+        for entry in entries:
+            if is_playlist or not entry.get('webpage_url') or not entry.get('url'):
+                # Playlist entries get resolved when they are about to play
+                songs.append(Song(
+                    title=entry.get('title', 'Unknown'),
+                    webpage_url=entry_page_url(entry),
+                    duration=entry.get('duration'),
+                    thumbnail=entry_thumbnail(entry),
+                    requester_id=user_id,
+                    is_lazy=True
+                ))
+            else:
+                # Single video: the full extraction already gave us a playable stream
+                audio_manager.stream_cache.put(stream_key(entry['webpage_url']), entry)
+                songs.append(Song(
+                    title=entry.get('title', 'Unknown'),
+                    url=entry['url'],
+                    webpage_url=entry['webpage_url'],
+                    duration=entry.get('duration'),
+                    thumbnail=entry.get('thumbnail'),
+                    requester_id=user_id,
+                    expires_at=stream_expiry(entry['url'], config.stream_default_ttl),
+                    codec=entry.get('acodec')
+                ))
+        
+        return songs
+    
+    async def _iter_playlist(self, query: str, user_id: int, guild_id: int) -> AsyncIterator[List[Song]]:
+        """Yield songs from a Spotify link or YouTube playlist page by page, as they arrive"""
         if audio_manager._is_spotify_url(query):
             if not audio_manager.spotify_client:
                 raise ValueError("Spotify support is not configured.")
             
-            songs = await audio_manager.get_spotify_tracks(query)
+            found_any = False
+            async for page in audio_manager.iter_spotify_tracks(query):
+                # Set requester for all songs
+                for song in page:
+                    song.requester_id = user_id
+                found_any = found_any or bool(page)
+                yield page
             
-            if not songs:
+            if not found_any:
                 raise ValueError("Couldn't find any tracks in that Spotify link.")
-            
-            # Set requester for all songs
-            for song in songs:
-                song.requester_id = user_id
-            
-            return songs
-        
-        # Handle YouTube/other URLs and search queries
-        ydl_opts = config.ydl_options.copy()
-        
-        if audio_manager._is_http_url(query):
-            # It's a URL - check if it's a playlist
-            if 'list=' in query or 'playlist' in query.lower():
-                ydl_opts['noplaylist'] = False
-                ydl_opts['extract_flat'] = False
-                # Remove any single search constraints for playlists
-                if 'default_search' in ydl_opts:
-                    del ydl_opts['default_search']
-            else:
-                ydl_opts['noplaylist'] = True
-        else:
-            # It's a search query - single video only
-            ydl_opts['default_search'] = 'ytsearch1'
-            ydl_opts['noplaylist'] = True
-        
-        def _extract_info():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(query, download=False)
-                entries = info.get('entries', [info]) if 'entries' in info else [info]
-                
-                extracted_songs = []
-                for entry in entries:
-                    if entry:
-                        extracted_songs.append(Song(
-                            title=entry.get('title', 'Unknown'),
-                            webpage_url=entry.get('webpage_url') or entry.get('url'),
-                            duration=entry.get('duration'),
-                            thumbnail=entry.get('thumbnail'),
-                            requester_id=user_id,
-                            is_lazy=True
-                        ))
-                
-                return extracted_songs
-        
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        songs = await loop.run_in_executor(None, _extract_info)
+            return
         
-        return songs
+        async for entries in audio_manager.iter_youtube_playlist(query, guild_id):
+            yield self._songs_from_entries(entries, user_id, is_playlist=True)
     
     async def _process_playlist_batch(self, ctx, query: str, processing_msg):
-        """Process playlists in batches with progress updates"""
+        """Queue playlist pages as they are listed, starting playback with the first one"""
         try:
-            # First, get playlist info quickly
-            songs = await self._process_query(query, ctx.author.id)
-            
-            if not songs:
-                await processing_msg.edit(content="❌ Couldn't find anything to play with that query.")
-                return
-            
-            total_songs = len(songs)
             playlist_type = "Spotify" if audio_manager._is_spotify_url(query) else "YouTube"
+            added_count = 0
             
-            # If it's a small playlist, process normally
-            if total_songs <= 5:
-                queue_position = audio_manager.add_songs(ctx.guild.id, songs)
+            async for page in self._iter_playlist(query, ctx.author.id, ctx.guild.id):
+                if not page:
+                    continue
                 
-                # Start playing if nothing is currently playing
-                if not ctx.voice_client.is_playing() and not ctx.voice_client.is_paused():
-                    await play_current_song(ctx)
+                audio_manager.add_songs(ctx.guild.id, page)
+                first_page = added_count == 0
+                added_count += len(page)
                 
-                await processing_msg.edit(
-                    content=f"✅ Added **{total_songs}** songs from {playlist_type} playlist to the queue"
-                )
-                await ui_manager.update_all_ui(ctx)
-                log_audio_event(ctx.guild.id, "songs_added", f"{total_songs} songs")
-                return
-            
-            # For large playlists, process in batches
-            batch_size = 5
-            added_count = 0
-            
-            # Add first batch immediately
-            first_batch = songs[:batch_size]
-            queue_position = audio_manager.add_songs(ctx.guild.id, first_batch)
-            added_count += len(first_batch)
+                if first_page:
+                    # Start playing if nothing is currently playing
+                    await get_player(ctx).submit(PLAY)
+                    
+                    await processing_msg.edit(
+                        content=f"🎵 Playing first song! Loading the rest of the {playlist_type} playlist... (**{added_count}** songs so far)"
+                    )
+                    event_bus.publish(QUEUE_CHANGED, ctx=ctx)
+                else:
+                    await processing_msg.edit(
+                        content=f"🔄 Loading {playlist_type} playlist... **{added_count}** songs added so far"
+                    )
             
-            # Start playing if nothing is currently playing
-            if not ctx.voice_client.is_playing() and not ctx.voice_client.is_paused():
-                await play_current_song(ctx)
+            if added_count == 0:
+                await processing_msg.edit(content="❌ Couldn't find anything to play with that query.")
+                return
             
-            # Update progress
             await processing_msg.edit(
-                content=f"🎵 Playing first song! Adding remaining **{total_songs - added_count}** songs in background..."
+                content=f"✅ Added **{added_count}** songs from {playlist_type} playlist to the queue"
             )
-            await ui_manager.update_all_ui(ctx)
-            
-            # Process remaining songs in background
-            remaining_songs = songs[batch_size:]
-            asyncio.create_task(self._background_playlist_add(ctx, remaining_songs, total_songs, playlist_type))
+            await ui_manager.update_queue(ctx)
+            log_audio_event(ctx.guild.id, "playlist_completed", f"{added_count} songs")
             
+        except ValueError as e:
+            await processing_msg.edit(content=f"❌ {str(e)}")
         except Exception as e:
             logger.error("process_playlist_batch", e, guild_id=ctx.guild.id)
             await processing_msg.edit(content="❌ Error processing playlist. Please try again.")
     
-    async def _background_playlist_add(self, ctx, remaining_songs: List[Song], total_songs: int, playlist_type: str):
-        """Add remaining playlist songs in background"""
-        try:
-            batch_size = 10
-            added_count = total_songs - len(remaining_songs)  # Already added first batch
-            
-            for i in range(0, len(remaining_songs), batch_size):
-                batch = remaining_songs[i:i + batch_size]
-                audio_manager.add_songs(ctx.guild.id, batch)
-                added_count += len(batch)
-                
-                # Small delay to prevent overwhelming
-                await asyncio.sleep(0.5)
-            
-            # Final update
-            await ctx.send(f"✅ Finished adding all **{total_songs}** songs from {playlist_type} playlist!")
-            await ui_manager.update_queue(ctx)  # Update queue UI
-            log_audio_event(ctx.guild.id, "playlist_completed", f"{total_songs} songs")
-            
-        except Exception as e:
-            logger.error("background_playlist_add", e, guild_id=ctx.guild.id)
-    
     @commands.command(aliases=['q'])
     async def queue(self, ctx):
         """Show the current queue"""
@@ -304,7 +285,7 @@ class MusicCog(commands.Cog):
             return
         
         if ctx.voice_client.is_playing() or ctx.voice_client.is_paused():
-            ctx.voice_client.stop()
+            await get_player(ctx).submit(SKIP)
             await ctx.send("⏭️ Skipped to next song")
             log_audio_event(ctx.guild.id, "skipped")
         else:
@@ -319,13 +300,10 @@ class MusicCog(commands.Cog):
             await ctx.send("❌ Arre, main toh kisi voice channel mein hi nahi hoon!")
             return
         
-        audio_manager.clear_queue(ctx.guild.id)
-        
-        if ctx.voice_client.is_playing() or ctx.voice_client.is_paused():
-            ctx.voice_client.stop()
+        await get_player(ctx).submit(STOP)
         
         await ctx.send("⏹️ Music band aur queue bhi clear kar di!")
-        await ui_manager.update_all_ui(ctx)
+        event_bus.publish(QUEUE_CHANGED, ctx=ctx)
         log_audio_event(ctx.guild.id, "stopped")
     
     @commands.command()
@@ -338,11 +316,12 @@ class MusicCog(commands.Cog):
             return
         
         # Clean up
-        audio_manager.clear_queue(ctx.guild.id)
-        audio_manager.cancel_alone_timer(ctx.guild.id)
+        await get_player(ctx).submit(STOP)
+        audio_manager.cancel_guild_timers(ctx.guild.id)
         await ui_manager.cleanup_all_messages(ctx.guild.id)
         
         await ctx.voice_client.disconnect()
+        audio_manager.remove_player(ctx.guild.id)
         await ctx.send("👋 Okay, main chali. Phir milte hain!")
         log_audio_event(ctx.guild.id, "left_voice_channel")
     
@@ -364,14 +343,7 @@ class MusicCog(commands.Cog):
             await ctx.send(f"❌ Invalid position! Choose between 1 and {len(queue)}")
             return
         
-        if audio_manager.jump_to_song(ctx.guild.id, target_index):
-            # Stop current song if playing
-            if ctx.voice_client and (ctx.voice_client.is_playing() or ctx.voice_client.is_paused()):
-                ctx.voice_client.stop()
-            
-            # Play the selected song
-            await play_current_song(ctx)
-            
+        if await get_player(ctx).submit(JUMP, index=target_index):
             song_title = queue[target_index].title
             await ctx.send(f"⏭️ Jumped to position {position}: **{song_title}**")
             log_audio_event(ctx.guild.id, "jumped_to_song", song_title)
@@ -415,8 +387,7 @@ class MusicCog(commands.Cog):
         # Handle removing currently playing song
         current_idx = audio_manager.guild_current_index.get(ctx.guild.id, 0)
         if index == current_idx:
-            if ctx.voice_client and (ctx.voice_client.is_playing() or ctx.voice_client.is_paused()):
-                ctx.voice_client.stop()
+            await get_player(ctx).submit(SKIP)
             await ctx.send(f"⏭️ Skipped currently playing song")
         else:
             removed_song = audio_manager.remove_song(ctx.guild.id, index)
@@ -478,15 +449,73 @@ class MusicCog(commands.Cog):
             await ctx.send(f"❌ Volume must be between {config.min_volume} and {config.max_volume}")
             return
         
-        audio_manager.set_volume(ctx.guild.id, vol)
-        
         # Apply to current source if playing
-        if ctx.voice_client and ctx.voice_client.source:
-            ctx.voice_client.source.volume = vol
+        await get_player(ctx).submit(VOLUME, volume=vol)
         
         await ctx.send(f"🔊 Volume set to **{vol}** (session only)")
         log_audio_event(ctx.guild.id, "volume_changed", str(vol))
     
+    @commands.command()
+    async def seek(self, ctx, timestamp: str):
+        """Jump to a position in the current song (seconds or mm:ss)"""
+        log_command_usage(ctx, "seek", timestamp)
+        
+        seconds = self._parse_timestamp(timestamp)
+        if seconds is None:
+            await ctx.send("❌ Invalid time! Use seconds or mm:ss, e.g. `!seek 1:30`")
+            return
+        
+        await self._seek_to(ctx, seconds)
+    
+    @commands.command(aliases=['ff'])
+    async def forward(self, ctx, seconds: int = 10):
+        """Skip ahead in the current song"""
+        log_command_usage(ctx, "forward", str(seconds))
+        
+        await self._seek_to(ctx, seconds, relative=True)
+    
+    @commands.command(aliases=['rw'])
+    async def rewind(self, ctx, seconds: int = 10):
+        """Go back in the current song"""
+        log_command_usage(ctx, "rewind", str(seconds))
+        
+        await self._seek_to(ctx, -seconds, relative=True)
+    
+    async def _seek_to(self, ctx, seconds: float, relative: bool = False):
+        """Seek the current song (to a position, or by an offset) and report where playback is now"""
+        if not ctx.voice_client or not (ctx.voice_client.is_playing() or ctx.voice_client.is_paused()):
+            await ctx.send("❌ Nothing is currently playing!")
+            return
+        
+        # Seeking goes through the player so a track end or skip can't interleave with it
+        position = await get_player(ctx).submit(SEEK, position=seconds, relative=relative)
+        if position is False:
+            await ctx.send("❌ Couldn't seek in this song. Please try again.")
+            return
+        
+        if position is None:
+            await ctx.send("❌ Nothing is currently playing!")
+            return
+        
+        await ctx.send(f"⏩ Now at **{self._format_timestamp(position)}**")
+        log_audio_event(ctx.guild.id, "seek", str(int(position)))
+    
+    def _parse_timestamp(self, timestamp: str) -> Optional[float]:
+        """Parse seconds, mm:ss or hh:mm:ss into seconds"""
+        try:
+            seconds = 0.0
+            for part in timestamp.split(':'):
+                seconds = seconds * 60 + float(part)
+            return seconds if seconds >= 0 else None
+        except ValueError:
+            return None
+    
+    def _format_timestamp(self, seconds: float) -> str:
+        """Format seconds as M:SS or H:MM:SS"""
+        m, s = divmod(int(seconds), 60)
+        h, m = divmod(m, 60)
+        return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+    
     @commands.command(aliases=['cleanup', 'clean'])
     async def cleanqueue(self, ctx):
         """Remove invalid/broken songs from the queue"""
@@ -528,6 +557,14 @@ class MusicCog(commands.Cog):
             logger.error("jump_command_error", error, guild_id=ctx.guild.id)
             await ctx.send("❌ An error occurred with the jump command.")
     
+    @seek.error
+    async def seek_error(self, ctx, error):
+        if isinstance(error, commands.MissingRequiredArgument):
+            await ctx.send("❌ You need to specify a time!\nUsage: `!seek <seconds or mm:ss>`")
+        else:
+            logger.error("seek_command_error", error, guild_id=ctx.guild.id)
+            await ctx.send("❌ An error occurred with the seek command.")
+    
     @volume.error
     async def volume_error(self, ctx, error):
         if isinstance(error, commands.MissingRequiredArgument):
@@ -550,7 +587,7 @@ async def play_current_song(ctx):
         
         if not current_song:
             await ctx.send("❌ No more songs to play!")
-            await ui_manager.update_all_ui(ctx)
+            event_bus.publish(QUEUE_CHANGED, ctx=ctx)
             return
         
         if not ctx.voice_client:
@@ -563,39 +600,45 @@ async def play_current_song(ctx):
             return
         
         try:
+            # Events from this playback are ignored once something else has started
+            player = get_player(ctx)
+            generation = player.next_generation()
+            
+            def track_advanced(song):
+                # Gapless/crossfade session moved on to the next song (audio thread)
+                player.post_threadsafe(ctx.bot.loop, TRACK_ADVANCED, generation, song=song)
+            
             # Create audio source
-            source = await audio_manager.create_audio_source(current_song, guild_id)
+            source = await audio_manager.get_audio_source(current_song, guild_id, on_advance=track_advanced)
             
             def after_playing(error):
                 if error:
                     logger.error("audio_playback", Exception(str(error)), guild_id=guild_id)
                 
-                # Schedule next song
-                if ctx.voice_client:
-                    fut = asyncio.run_coroutine_threadsafe(handle_song_end(ctx), ctx.bot.loop)
-                    try:
-                        fut.result()
-                    except Exception as e:
-                        logger.error("after_playing_future", e, guild_id=guild_id)
+                # Hand the transition to the guild's player - never block the audio thread
+                player.post_threadsafe(ctx.bot.loop, TRACK_ENDED, generation)
             
             # Start playback
             ctx.voice_client.play(source, after=after_playing)
+            audio_manager.cancel_idle_timer(guild_id)
+            audio_manager.prewarmer.track_started(guild_id, current_song)
             
-            # Record song play in stats
-            await stats_manager.record_song_play(
-                guild_id=guild_id,
-                title=current_song.title,
-                requester_id=current_song.requester_id,
-                duration=current_song.duration,
-                guild_name=ctx.guild.name
-            )
-            
-            # Update UI
-            await ui_manager.update_all_ui(ctx)
+            # Stats and UI catch up from the event bus; playback doesn't wait on them
+            event_bus.publish(SONG_STARTED, ctx=ctx, song=current_song)
             
             log_audio_event(guild_id, "song_started", current_song.title)
             return  # Successfully started playing
             
+        except CircuitOpenError as e:
+            # YouTube is rate-limiting us - the song is fine, so keep it and try again later
+            audio_manager.start_retry_timer(guild_id, e.retry_after, lambda: get_player(ctx).post(PLAY))
+            await ctx.send(
+                f"⏳ YouTube is rate-limiting requests right now. "
+                f"**{current_song.title}** will start in about {e.retry_after:.0f}s."
+            )
+            log_audio_event(guild_id, "playback_deferred", current_song.title)
+            return
+            
         except Exception as e:
             retry_count += 1
             logger.error("play_current_song", e, guild_id=guild_id, song_title=current_song.title)
@@ -626,12 +669,85 @@ async def play_current_song(ctx):
         "• Playlist issues\n\n"
         "🔧 Try adding individual songs or different playlists."
     )
-    await ui_manager.update_all_ui(ctx)
+    event_bus.publish(QUEUE_CHANGED, ctx=ctx)
+
+
+def get_player(ctx) -> GuildPlayer:
+    """Get the guild's player, remembering ctx for its replies"""
+    player = audio_manager.get_player(ctx.guild.id, handle_player_event)
+    player.ctx = ctx
+    return player
+
+
+async def handle_player_event(player: GuildPlayer, event: PlayerEvent):
+    """Apply one playback event - the guild's player runs these one at a time"""
+    ctx = player.ctx
+    guild_id = ctx.guild.id
+    vc = ctx.voice_client
+    active = vc is not None and (vc.is_playing() or vc.is_paused())
+    
+    if event.kind == TRACK_ENDED:
+        if vc:
+            await handle_song_end(ctx)
+    
+    elif event.kind == TRACK_ADVANCED:
+        await handle_track_advanced(ctx, event.data['song'])
+    
+    elif event.kind == PLAY:
+        if vc and not active:
+            await play_current_song(ctx)
+    
+    elif event.kind == SKIP:
+        if active:
+            # Move on here rather than in the stopped track's end event, so a
+            # command queued right behind the skip already sees the next song
+            player.next_generation()
+            vc.stop()
+            await handle_song_end(ctx)
+        elif audio_manager.next_song(guild_id):
+            await play_current_song(ctx)
+    
+    elif event.kind == SEEK:
+        position = event.data['position']
+        if event.data.get('relative'):
+            current = audio_manager.get_position(guild_id)
+            if current is None:
+                return None
+            position += current
+        try:
+            return await audio_manager.seek(guild_id, vc, position)
+        except Exception as e:
+            logger.error("seek", e, guild_id=guild_id)
+            return False
+    
+    elif event.kind in (PREVIOUS, JUMP):
+        if event.kind == PREVIOUS:
+            moved = audio_manager.previous_song(guild_id)
+        else:
+            moved = audio_manager.jump_to_song(guild_id, event.data['index'])
+        if not moved:
+            return False
+        
+        if active:
+            player.next_generation()  # The stopped track's end event is stale now
+            vc.stop()
+        await play_current_song(ctx)
+        return True
+    
+    elif event.kind == STOP:
+        audio_manager.clear_queue(guild_id)
+        player.next_generation()
+        if active:
+            vc.stop()
+    
+    elif event.kind == VOLUME:
+        await audio_manager.apply_volume(guild_id, vc, event.data['volume'])
 
 
 async def handle_song_end(ctx):
     """Handle what happens when a song ends"""
     guild_id = ctx.guild.id
+    audio_manager.telemetry.forget(guild_id)
     
     try:
         # Check repeat mode
@@ -646,10 +762,10 @@ async def handle_song_end(ctx):
         else:
             # Queue finished
             await ctx.send("🎵 Queue finished! Add more songs or I'll leave in 5 minutes if inactive.")
-            await ui_manager.update_all_ui(ctx)
+            event_bus.publish(QUEUE_CHANGED, ctx=ctx)
             
             # Start idle timer
-            asyncio.create_task(idle_disconnect(ctx))
+            audio_manager.start_idle_timer(guild_id, lambda: idle_disconnect(ctx))
             
             log_audio_event(guild_id, "queue_finished")
             
@@ -657,18 +773,39 @@ async def handle_song_end(ctx):
         logger.error("handle_song_end", e, guild_id=guild_id)
 
 
-async def idle_disconnect(ctx):
-    """Disconnect after idle timeout if nothing is playing"""
-    await asyncio.sleep(config.idle_timeout)
+async def handle_track_advanced(ctx, song):
+    """Catch the queue up after a gapless/crossfade session switched to the next song"""
+    guild_id = ctx.guild.id
     
+    try:
+        if audio_manager.get_current_song(guild_id) is not song:
+            queue = audio_manager.get_queue(guild_id)
+            index = next((i for i, queued in enumerate(queue) if queued is song), None)
+            if index is not None:
+                audio_manager.jump_to_song(guild_id, index)
+        
+        audio_manager.prewarmer.track_started(guild_id, song)
+        
+        event_bus.publish(SONG_STARTED, ctx=ctx, song=song)
+        
+        log_audio_event(guild_id, "song_started", song.title)
+        
+    except Exception as e:
+        logger.error("handle_track_advanced", e, guild_id=guild_id)
+
+
+async def idle_disconnect(ctx):
+    """Idle timer fired: disconnect if nothing is playing"""
     if (ctx.voice_client and 
         not ctx.voice_client.is_playing() and 
         not audio_manager.get_queue(ctx.guild.id)):
         
         await ctx.send("💤 Disconnecting due to inactivity. See you later!")
-        audio_manager.cancel_alone_timer(ctx.guild.id)
+        await get_player(ctx).submit(STOP)
+        audio_manager.cancel_guild_timers(ctx.guild.id)
         await ui_manager.cleanup_all_messages(ctx.guild.id)
         await ctx.voice_client.disconnect()
+        audio_manager.remove_player(ctx.guild.id)
         log_audio_event(ctx.guild.id, "idle_disconnect")
 
 
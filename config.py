@@ -23,6 +23,8 @@ class BotConfig:
     # Spotify settings
     spotify_client_id: Optional[str] = None
     spotify_client_secret: Optional[str] = None
+    spotify_track_limit: int = 100  # Max tracks taken from one playlist/album
+    spotify_concurrency: int = 4  # Concurrent Spotify API requests
     
     # File paths
     error_log_file: str = 'bot_errors.log'
@@ -31,8 +33,77 @@ class BotConfig:
     ffmpeg_options: dict = None
     ydl_options: dict = None
     
+    # Playback pipeline
+    opus_passthrough: bool = True  # Let FFmpeg produce Opus (copying it when possible) instead of PCM
+    opus_bitrate: int = 128  # kbps, when FFmpeg has to encode
+    numpy_volume: bool = True  # Vectorized PCM volume when numpy is installed
+    volume_ramp_ms: int = 60  # Fade volume changes over this long to avoid clicks
+    
+    # Resolved stream cache
+    stream_cache_size: int = 500
+    stream_expiry_margin: int = 300  # Treat URLs as expired 5 minutes early
+    stream_default_ttl: int = 3600  # Used when a URL carries no expire= parameter
+    
+    # Extraction pool
+    extraction_workers: int = 4
+    extraction_mode: str = 'thread'  # 'thread' or 'process'
+    ydl_pool_size: int = 4  # Idle YoutubeDL instances kept per option profile
+    
+    # Playlists
+    playlist_flat: bool = True  # List playlists as stubs and resolve streams later
+    playlist_max_entries: int = 500  # Cap for flat playlist listings
+    playlist_page_size: int = 100  # Entries listed per page while streaming a playlist in
+    
+    # Spotify -> YouTube match index
+    match_cache_file: str = 'cache/spotify_matches.json'
+    match_cache_size: int = 50000
+    
+    # Known-unplayable videos and searches (deleted, private, region-blocked, no results)
+    negative_cache_file: str = 'cache/unplayable.json'
+    negative_cache_size: int = 20000
+    
+    # Local audio cache for popular tracks (off by default)
+    audio_cache_enabled: bool = False
+    audio_cache_dir: str = 'cache/audio'
+    audio_cache_max_mb: int = 2048
+    audio_cache_policy: str = 'lru'  # 'lru' or 'lfu'
+    audio_cache_min_plays: int = 3  # Plays before a track is downloaded
+    audio_cache_max_duration: int = 900  # Don't cache tracks longer than 15 minutes
+    
+    # Song resolution
+    resolve_hedge_fanout: int = 2  # Search variants tried concurrently per song (1 = one at a time)
+    resolve_deadline: float = 20.0  # Give up on a song after this many seconds
+    
+    # Extraction circuit breaker (trips on YouTube rate limiting)
+    breaker_threshold: int = 3  # Rate-limited extractions in a row before pausing
+    breaker_backoff: float = 30.0  # First pause in seconds; doubles after each failed probe
+    breaker_max_backoff: float = 900.0  # Longest pause
+    
+    # Look-ahead prefetching
+    prefetch_depth: int = 2  # Upcoming songs to resolve per guild
+    prefetch_concurrency: int = 4  # Concurrent prefetch resolutions across all guilds
+    
+    # Expiring stream refresh
+    refresh_interval: int = 120  # Seconds between sweeps over all queues
+    refresh_scan_depth: int = 50  # Upcoming songs checked per guild
+    refresh_concurrency: int = 2  # Concurrent refreshes across all guilds
+    
+    # Next-track pre-warming
+    prewarm_enabled: bool = True  # Start the next song's FFmpeg before the current one ends
+    prewarm_lead: int = 5  # Seconds before the end of the current track
+    prewarm_frames: int = 100  # 20 ms frames to buffer ahead (2 seconds)
+    
+    # Gapless / crossfade playback (decodes to PCM, so Opus passthrough is skipped)
+    gapless: bool = False  # Splice consecutive tracks without a gap
+    crossfade_ms: int = 0  # Overlap consecutive tracks by this much (0 = off; implies gapless)
+    
+    # Playback telemetry
+    playback_snapshot_file: str = 'stats/playback.json'  # Read by the dashboard's /api/playback
+    playback_snapshot_interval: int = 5  # Seconds between snapshots
+    
     # UI settings
     queue_per_page: int = 10
+    ui_redraw_delay: float = 0.5  # Seconds to collect song/queue changes into one redraw
     search_results_limit: int = 10
     
     # Rate limiting
@@ -77,10 +148,53 @@ def load_config() -> BotConfig:
         discord_token=discord_token,
         spotify_client_id=os.getenv('SPOTIFY_CLIENT_ID'),
         spotify_client_secret=os.getenv('SPOTIPY_CLIENT_SECRET'),
+        spotify_track_limit=int(os.getenv('SPOTIFY_TRACK_LIMIT', '100')),
+        spotify_concurrency=int(os.getenv('SPOTIFY_CONCURRENCY', '4')),
         default_prefix=os.getenv('DEFAULT_PREFIX', '!'),
         default_volume=float(os.getenv('DEFAULT_VOLUME', '0.5')),
         idle_timeout=int(os.getenv('IDLE_TIMEOUT', '300')),
         alone_timeout=int(os.getenv('ALONE_TIMEOUT', '60')),
+        opus_passthrough=os.getenv('OPUS_PASSTHROUGH', 'true').lower() in ('1', 'true', 'yes'),
+        opus_bitrate=int(os.getenv('OPUS_BITRATE', '128')),
+        numpy_volume=os.getenv('NUMPY_VOLUME', 'true').lower() in ('1', 'true', 'yes'),
+        volume_ramp_ms=int(os.getenv('VOLUME_RAMP_MS', '60')),
+        stream_cache_size=int(os.getenv('STREAM_CACHE_SIZE', '500')),
+        stream_expiry_margin=int(os.getenv('STREAM_EXPIRY_MARGIN', '300')),
+        stream_default_ttl=int(os.getenv('STREAM_DEFAULT_TTL', '3600')),
+        extraction_workers=int(os.getenv('EXTRACTION_WORKERS', '4')),
+        extraction_mode=os.getenv('EXTRACTION_MODE', 'thread'),
+        ydl_pool_size=int(os.getenv('YDL_POOL_SIZE', '4')),
+        playlist_flat=os.getenv('PLAYLIST_FLAT', 'true').lower() in ('1', 'true', 'yes'),
+        playlist_max_entries=int(os.getenv('PLAYLIST_MAX_ENTRIES', '500')),
+        playlist_page_size=int(os.getenv('PLAYLIST_PAGE_SIZE', '100')),
+        match_cache_file=os.getenv('MATCH_CACHE_FILE', 'cache/spotify_matches.json'),
+        match_cache_size=int(os.getenv('MATCH_CACHE_SIZE', '50000')),
+        negative_cache_file=os.getenv('NEGATIVE_CACHE_FILE', 'cache/unplayable.json'),
+        negative_cache_size=int(os.getenv('NEGATIVE_CACHE_SIZE', '20000')),
+        audio_cache_enabled=os.getenv('AUDIO_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes'),
+        audio_cache_dir=os.getenv('AUDIO_CACHE_DIR', 'cache/audio'),
+        audio_cache_max_mb=int(os.getenv('AUDIO_CACHE_MAX_MB', '2048')),
+        audio_cache_policy=os.getenv('AUDIO_CACHE_POLICY', 'lru'),
+        audio_cache_min_plays=int(os.getenv('AUDIO_CACHE_MIN_PLAYS', '3')),
+        audio_cache_max_duration=int(os.getenv('AUDIO_CACHE_MAX_DURATION', '900')),
+        resolve_hedge_fanout=int(os.getenv('RESOLVE_HEDGE_FANOUT', '2')),
+        resolve_deadline=float(os.getenv('RESOLVE_DEADLINE', '20')),
+        breaker_threshold=int(os.getenv('BREAKER_THRESHOLD', '3')),
+        breaker_backoff=float(os.getenv('BREAKER_BACKOFF', '30')),
+        breaker_max_backoff=float(os.getenv('BREAKER_MAX_BACKOFF', '900')),
+        prefetch_depth=int(os.getenv('PREFETCH_DEPTH', '2')),
+        prefetch_concurrency=int(os.getenv('PREFETCH_CONCURRENCY', '4')),
+        refresh_interval=int(os.getenv('REFRESH_INTERVAL', '120')),
+        refresh_scan_depth=int(os.getenv('REFRESH_SCAN_DEPTH', '50')),
+        refresh_concurrency=int(os.getenv('REFRESH_CONCURRENCY', '2')),
+        prewarm_enabled=os.getenv('PREWARM_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        prewarm_lead=int(os.getenv('PREWARM_LEAD', '5')),
+        prewarm_frames=int(os.getenv('PREWARM_FRAMES', '100')),
+        gapless=os.getenv('GAPLESS', 'false').lower() in ('1', 'true', 'yes'),
+        crossfade_ms=int(os.getenv('CROSSFADE_MS', '0')),
+        playback_snapshot_file=os.getenv('PLAYBACK_SNAPSHOT_FILE', 'stats/playback.json'),
+        playback_snapshot_interval=int(os.getenv('PLAYBACK_SNAPSHOT_INTERVAL', '5')),
+        ui_redraw_delay=float(os.getenv('UI_REDRAW_DELAY', '0.5')),
     )
 
 
@@ -8,9 +8,11 @@ import asyncio
 import threading
 import time
 from datetime import datetime, timedelta
+from config import config
 from utils.logger import logger
 from utils.stats_manager import stats_manager
 import json
+import os
 
 
 app = Flask(__name__)
@@ -22,6 +24,9 @@ cached_stats = {}
 cache_timestamp = 0
 CACHE_DURATION = 30  # Cache for 30 seconds
 
+# Written by the bot every few seconds (see audio/telemetry.py)
+PLAYBACK_SNAPSHOT_FILE = config.playback_snapshot_file
+
 
 class DashboardManager:
     """Manages dashboard data and real-time updates"""
@@ -196,6 +201,29 @@ def api_stats():
         }), 500
 
 
+@app.route('/api/playback')
+def api_playback():
+    """API endpoint for per-guild playback timing"""
+    try:
+        if not os.path.exists(PLAYBACK_SNAPSHOT_FILE):
+            return jsonify({'success': True, 'data': {'guilds': {}}})
+        
+        with open(PLAYBACK_SNAPSHOT_FILE, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        
+        snapshot['age_seconds'] = round(time.time() - snapshot.get('timestamp', 0), 1)
+        return jsonify({
+            'success': True,
+            'data': snapshot
+        })
+    except Exception as e:
+        logger.error("api_playback", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/health')
 def api_health():
     """Health check endpoint"""
@@ -0,0 +1,4 @@
+"""
+Tests for Music Bot
+Run from the project root with python -m pytest
+"""
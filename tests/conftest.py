@@ -0,0 +1,4 @@
+import os
+
+# config.py refuses to load without a token; the tests never connect
+os.environ.setdefault('DISCORD_TOKEN', 'test')
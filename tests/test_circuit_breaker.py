@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from audio import circuit_breaker
+from audio.circuit_breaker import (
+    CircuitBreaker, CircuitOpenError, classify_error,
+    CLOSED, OPEN, HALF_OPEN,
+    RATE_LIMITED, UNAVAILABLE, PRIVATE, REGION_BLOCKED, AGE_RESTRICTED, TRANSIENT, UNKNOWN,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', fake)
+    return fake
+
+
+def rate_limited():
+    return Exception("ERROR: [youtube] abc: HTTP Error 429: Too Many Requests")
+
+
+def tripped(threshold=2, base=30.0, maximum=120.0) -> CircuitBreaker:
+    breaker = CircuitBreaker(threshold, base, maximum)
+    for _ in range(threshold):
+        breaker.before_call()
+        breaker.record_failure(rate_limited())
+    return breaker
+
+
+@pytest.mark.parametrize('message, expected', [
+    ("HTTP Error 429: Too Many Requests", RATE_LIMITED),
+    ("Sign in to confirm you’re not a bot", RATE_LIMITED),
+    ("Video unavailable", UNAVAILABLE),
+    ("This video has been removed by the uploader", UNAVAILABLE),
+    ("Private video. Sign in if you've been granted access", PRIVATE),
+    ("The uploader has not made this video available in your country", REGION_BLOCKED),
+    ("Sign in to confirm your age", AGE_RESTRICTED),
+    ("HTTP Error 503: Service Unavailable", TRANSIENT),
+    ("something else entirely", UNKNOWN),
+])
+def test_classify_error_messages(message, expected):
+    assert classify_error(Exception(message)) == expected
+
+
+def test_classify_error_types():
+    assert classify_error(asyncio.TimeoutError()) == TRANSIENT
+    assert classify_error(ConnectionResetError()) == TRANSIENT
+
+
+def test_opens_after_threshold_rate_limits(clock):
+    breaker = CircuitBreaker(3, 30.0, 120.0)
+    for _ in range(2):
+        assert breaker.before_call() is False
+        breaker.record_failure(rate_limited())
+    assert breaker.state == CLOSED
+
+    breaker.before_call()
+    breaker.record_failure(rate_limited())
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == pytest.approx(30.0)
+    assert breaker.rejected == 1
+
+
+def test_other_failures_do_not_trip(clock):
+    breaker = CircuitBreaker(2, 30.0, 120.0)
+    breaker.record_failure(rate_limited())
+    breaker.record_failure(Exception("Video unavailable"))
+    breaker.record_failure(rate_limited())
+    assert breaker.state == CLOSED
+    assert breaker.failures == {RATE_LIMITED: 2, UNAVAILABLE: 1}
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = tripped()
+    clock.now += 30
+
+    assert breaker.before_call() is True
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_probe_success_closes(clock):
+    breaker = tripped()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure(rate_limited())
+    assert breaker.backoff == 60.0
+
+    clock.now += 60
+    assert breaker.before_call() is True
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.backoff == 30.0
+    assert breaker.before_call() is False
+
+
+def test_probe_answered_with_video_error_closes(clock):
+    breaker = tripped()
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure(Exception("Private video"), probe=True)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probes_double_backoff_up_to_max(clock):
+    breaker = tripped(base=30.0, maximum=100.0)
+    backoffs = []
+    for _ in range(4):
+        clock.now += breaker.backoff
+        assert breaker.before_call() is True
+        breaker.record_failure(rate_limited(), probe=True)
+        assert breaker.state == OPEN
+        backoffs.append(breaker.backoff)
+
+    assert backoffs == [60.0, 100.0, 100.0, 100.0]
+    assert breaker.retry_after == pytest.approx(100.0)
+
+
+def test_abandoned_probe_lets_the_next_call_probe(clock):
+    breaker = tripped()
+    clock.now += 30
+    assert breaker.before_call() is True
+    breaker.release_probe()
+    assert breaker.before_call() is True
+
+
+def test_non_probe_timeout_keeps_the_probe_slot(clock):
+    breaker = tripped()
+    clock.now += 30
+    assert breaker.before_call() is True
+
+    # A call from before the trip times out while the probe is still out
+    breaker.record_failure(asyncio.TimeoutError())
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure(asyncio.TimeoutError(), probe=True)
+    assert breaker.before_call() is True
+
+
+def test_max_backoff_is_configurable(monkeypatch):
+    from config import load_config
+
+    monkeypatch.setenv('BREAKER_MAX_BACKOFF', '240')
+    assert load_config().breaker_max_backoff == 240.0
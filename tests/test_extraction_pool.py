@@ -0,0 +1,190 @@
+import asyncio
+import threading
+
+import pytest
+
+from audio.extraction import ExtractionPool, INTERACTIVE, BACKGROUND
+from audio.singleflight import SingleFlight
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1)
+    yield pool
+    pool.shutdown()
+
+
+async def occupy(pool, **kwargs):
+    """Keep the only worker busy until the returned event is set"""
+    gate = threading.Event()
+    task = asyncio.ensure_future(pool.run(gate.wait, 2, **kwargs))
+    await asyncio.sleep(0)
+    return gate, task
+
+
+def submit(pool, order, name, **kwargs):
+    return asyncio.ensure_future(pool.run(order.append, name, **kwargs))
+
+
+async def drain(gate, *tasks):
+    await asyncio.sleep(0)
+    gate.set()
+    await asyncio.wait_for(asyncio.gather(*tasks), 2)
+
+
+@pytest.mark.asyncio
+async def test_interactive_runs_before_background(pool):
+    order = []
+    gate, busy = await occupy(pool)
+    jobs = [
+        submit(pool, order, 'prefetch', priority=BACKGROUND),
+        submit(pool, order, 'play', priority=INTERACTIVE),
+    ]
+    await drain(gate, busy, *jobs)
+    assert order == ['play', 'prefetch']
+
+
+@pytest.mark.asyncio
+async def test_round_robin_across_guilds(pool):
+    order = []
+    gate, busy = await occupy(pool)
+    jobs = [submit(pool, order, f'a{i}', guild_id=1) for i in range(3)]
+    jobs.append(submit(pool, order, 'b0', guild_id=2))
+    await drain(gate, busy, *jobs)
+    assert order == ['a0', 'b0', 'a1', 'a2']
+
+
+@pytest.mark.asyncio
+async def test_abandoned_job_is_skipped(pool):
+    order = []
+    gate, busy = await occupy(pool)
+    gone = submit(pool, order, 'gone')
+    kept = submit(pool, order, 'kept')
+    await asyncio.sleep(0)
+    gone.cancel()
+    await drain(gate, busy, kept)
+    assert order == ['kept']
+
+
+@pytest.mark.asyncio
+async def test_promote_queued_job(pool):
+    order = []
+    gate, busy = await occupy(pool)
+    jobs = [
+        submit(pool, order, 'refresh', priority=BACKGROUND),
+        submit(pool, order, 'prefetch', priority=BACKGROUND, tag='key'),
+    ]
+    await asyncio.sleep(0)
+    pool.promote('key')
+    await drain(gate, busy, *jobs)
+    assert order == ['prefetch', 'refresh']
+    assert pool.stats()['promoted'] == 1
+
+
+@pytest.mark.asyncio
+async def test_promote_before_the_job_is_submitted(pool):
+    order = []
+    gate, busy = await occupy(pool)
+    pool.promote('key')
+    jobs = [
+        submit(pool, order, 'refresh', priority=BACKGROUND),
+        submit(pool, order, 'prefetch', priority=BACKGROUND, tag='key'),
+    ]
+    await drain(gate, busy, *jobs)
+    assert order == ['prefetch', 'refresh']
+    assert not pool._urgent
+
+
+@pytest.mark.asyncio
+async def test_promote_running_job_is_a_noop(pool):
+    order = []
+    gate, busy = await occupy(pool, priority=BACKGROUND, tag='key')
+    pool.promote('key')
+    assert not pool._urgent
+    assert pool.stats()['promoted'] == 0
+    await drain(gate, busy)
+
+    # A later background job for the same key stays in the background
+    gate, busy = await occupy(pool)
+    jobs = [
+        submit(pool, order, 'refresh', priority=BACKGROUND),
+        submit(pool, order, 'prefetch', priority=BACKGROUND, tag='key'),
+    ]
+    await drain(gate, busy, *jobs)
+    assert order == ['refresh', 'prefetch']
+    assert not pool._tagged
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_the_caller(pool):
+    def broken():
+        raise ValueError("no")
+
+    with pytest.raises(ValueError):
+        await pool.run(broken)
+    assert pool.stats()['failed'] == 1
+
+
+@pytest.mark.asyncio
+async def test_singleflight_coalesces_concurrent_calls():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await release.wait()
+        return 'result'
+
+    first = asyncio.ensure_future(flights.do('key', factory))
+    second = asyncio.ensure_future(flights.do('key', factory))
+    await asyncio.sleep(0)
+    assert flights.in_flight('key')
+
+    release.set()
+    assert await asyncio.gather(first, second) == ['result', 'result']
+    assert len(calls) == 1
+    assert flights.stats() == {'in_flight': 0, 'hits': 1, 'misses': 1}
+
+    # Finished calls aren't reused
+    assert await flights.do('key', factory) == 'result'
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_singleflight_survives_one_caller_giving_up():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def factory():
+        await release.wait()
+        return 'result'
+
+    leaving = asyncio.ensure_future(flights.do('key', factory))
+    staying = asyncio.ensure_future(flights.do('key', factory))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    await asyncio.sleep(0)
+
+    release.set()
+    assert await staying == 'result'
+
+
+@pytest.mark.asyncio
+async def test_singleflight_cancelled_by_last_caller():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def factory():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    caller = asyncio.ensure_future(flights.do('key', factory))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert not flights.in_flight('key')
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from audio import negative_cache
+from audio.circuit_breaker import UNAVAILABLE, NOT_FOUND, RATE_LIMITED, TRANSIENT
+from audio.negative_cache import NegativeCache, FAILURE_TTLS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(negative_cache, 'time', fake)
+    return fake
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'cache' / 'negative.json')
+
+
+def test_records_and_returns_failures(clock, path):
+    cache = NegativeCache(path, max_entries=10)
+    cache.record('abc', UNAVAILABLE, "Video unavailable")
+
+    assert cache.get('abc') == UNAVAILABLE
+    assert cache.get('other') is None
+    assert cache.get(None) is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_uncacheable_failures_are_ignored(clock, path):
+    cache = NegativeCache(path, max_entries=10)
+    cache.record('abc', RATE_LIMITED)
+    cache.record('def', TRANSIENT)
+    assert cache.get('abc') is None
+    assert cache.get('def') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_entries_expire_per_failure_class(clock, path):
+    cache = NegativeCache(path, max_entries=10)
+    cache.record('deleted', UNAVAILABLE)
+    cache.record('search', NOT_FOUND)
+
+    clock.now += FAILURE_TTLS[NOT_FOUND] + 1
+    assert cache.get('search') is None
+    assert cache.get('deleted') == UNAVAILABLE
+
+    clock.now += FAILURE_TTLS[UNAVAILABLE]
+    assert cache.get('deleted') is None
+
+
+def test_forget(clock, path):
+    cache = NegativeCache(path, max_entries=10)
+    cache.record('abc', UNAVAILABLE)
+    cache.forget('abc')
+    assert cache.get('abc') is None
+
+
+def test_persists_across_restarts(clock, path):
+    # Without a running loop changes are written straight away
+    cache = NegativeCache(path, max_entries=10)
+    cache.record('deleted', UNAVAILABLE, "Video unavailable")
+    cache.record('search', NOT_FOUND)
+
+    with open(path, encoding='utf-8') as f:
+        assert set(json.load(f)) == {'deleted', 'search'}
+
+    clock.now += FAILURE_TTLS[NOT_FOUND] + 1
+    reloaded = NegativeCache(path, max_entries=10)
+    assert reloaded.stats()['entries'] == 1
+    assert reloaded.get('deleted') == UNAVAILABLE
+
+
+def test_trims_soonest_to_expire_first(clock, path):
+    cache = NegativeCache(path, max_entries=2)
+    cache.record('search', NOT_FOUND)
+    cache.record('deleted-1', UNAVAILABLE)
+    cache.record('deleted-2', UNAVAILABLE)
+
+    with open(path, encoding='utf-8') as f:
+        assert set(json.load(f)) == {'deleted-1', 'deleted-2'}
+
+
+def test_corrupt_file_starts_empty(clock, path, tmp_path):
+    (tmp_path / 'cache').mkdir()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{not json')
+    assert NegativeCache(path, max_entries=10).stats()['entries'] == 0
+
+
+@pytest.mark.asyncio
+async def test_saves_are_delayed_until_flush(clock, path):
+    cache = NegativeCache(path, max_entries=10, save_delay=60)
+    cache.record('abc', UNAVAILABLE)
+    cache.record('def', UNAVAILABLE)
+    assert not os.path.exists(path)
+
+    cache.flush()
+    with open(path, encoding='utf-8') as f:
+        assert set(json.load(f)) == {'abc', 'def'}
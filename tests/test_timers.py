@@ -0,0 +1,150 @@
+import asyncio
+
+import pytest
+
+from audio.timers import TimerWheel
+
+TICK = 0.02
+
+
+async def wait_ticks(n: int):
+    await asyncio.sleep(TICK * n)
+
+
+@pytest.mark.asyncio
+async def test_timer_fires_after_delay():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+    wheel.arm((1, 'idle'), TICK * 3, lambda: fired.append('idle'))
+
+    await wait_ticks(1)
+    assert fired == []
+    await wait_ticks(6)
+    assert fired == ['idle']
+    assert wheel.armed == 0
+    assert wheel.fired == 1
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_timer_longer_than_one_revolution():
+    wheel = TimerWheel(tick=TICK, slots=4)
+    fired = []
+    wheel.arm('long', TICK * 10, lambda: fired.append('long'))
+
+    # The slot comes round twice before the deadline
+    await wait_ticks(6)
+    assert fired == []
+    await wait_ticks(8)
+    assert fired == ['long']
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_async_callback_runs():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    done = asyncio.Event()
+
+    async def callback():
+        done.set()
+
+    wheel.arm('async', TICK, callback)
+    await asyncio.wait_for(done.wait(), 1)
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_rearm_replaces_previous_timer():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+    wheel.arm('key', TICK * 2, lambda: fired.append('first'))
+    wheel.arm('key', TICK * 4, lambda: fired.append('second'))
+    assert wheel.armed == 1
+
+    await wait_ticks(8)
+    assert fired == ['second']
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_cancel():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+    wheel.arm('key', TICK * 2, lambda: fired.append('key'))
+
+    assert wheel.cancel('key')
+    assert not wheel.cancel('key')
+    assert not wheel.is_armed('key')
+    await wait_ticks(4)
+    assert fired == []
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_callback_cancelling_another_due_timer():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+
+    def first():
+        fired.append('first')
+        wheel.cancel('second')
+
+    # Same deadline, so both are due in the same bucket
+    wheel.arm('first', TICK * 2, first)
+    wheel.arm('second', TICK * 2, lambda: fired.append('second'))
+
+    await wait_ticks(5)
+    assert fired == ['first']
+    assert wheel.armed == 0
+    assert wheel.fired == 1
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_callback_rearming_another_due_timer():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+
+    def first():
+        fired.append('first')
+        wheel.arm('second', TICK * 4, lambda: fired.append('second (re-armed)'))
+
+    wheel.arm('first', TICK * 2, first)
+    wheel.arm('second', TICK * 2, lambda: fired.append('second'))
+
+    await wait_ticks(4)
+    assert fired == ['first']
+    assert wheel.is_armed('second')
+    await wait_ticks(4)
+    assert fired == ['first', 'second (re-armed)']
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_failing_callback_does_not_stop_the_wheel():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    wheel.arm('broken', TICK, broken)
+    wheel.arm('ok', TICK * 3, lambda: fired.append('ok'))
+
+    await wait_ticks(6)
+    assert fired == ['ok']
+    wheel.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_disarms_everything():
+    wheel = TimerWheel(tick=TICK, slots=8)
+    fired = []
+    wheel.arm((1, 'alone'), TICK * 2, lambda: fired.append(1))
+    wheel.arm((2, 'idle'), TICK * 2, lambda: fired.append(2))
+    assert wheel.stats()['armed_alone'] == 1
+
+    wheel.stop()
+    await wait_ticks(4)
+    assert fired == []
+    assert wheel.armed == 0
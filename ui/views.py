@@ -2,12 +2,14 @@
 Discord UI components for Music Bot
 Interactive views and buttons for music control
 """
+import asyncio
 import discord
 from discord import ui, Embed
 from typing import Dict, Optional, Any
 from config import config
 from utils.logger import logger
 from audio.manager import audio_manager
+from audio.player import PREVIOUS, SKIP, STOP
 
 
 class NowPlayingView(ui.View):
@@ -80,13 +82,13 @@ class NowPlayingView(ui.View):
     async def prev_song(self, interaction: discord.Interaction):
         """Handle previous song button"""
         try:
-            if not audio_manager.previous_song(self.guild_id):
+            if audio_manager.guild_current_index.get(self.guild_id, 0) <= 0:
                 await interaction.response.send_message("❌ No previous song available.", ephemeral=True)
                 return
             
-            # Stop current song to trigger automatic next song play
-            if self.ctx.voice_client and (self.ctx.voice_client.is_playing() or self.ctx.voice_client.is_paused()):
-                self.ctx.voice_client.stop()
+            # The guild's player switches tracks; don't hold up the interaction response
+            from commands.music import get_player
+            get_player(self.ctx).post(PREVIOUS)
             
             await interaction.response.send_message("⏮️ Going to previous song", ephemeral=True)
             
@@ -150,14 +152,8 @@ class NowPlayingView(ui.View):
                 await interaction.response.send_message("❌ No next song available.", ephemeral=True)
                 return
             
-            # Stop current song to trigger automatic next song play
-            if self.ctx.voice_client and (self.ctx.voice_client.is_playing() or self.ctx.voice_client.is_paused()):
-                self.ctx.voice_client.stop()
-            else:
-                # If nothing is playing, manually advance to next song
-                if audio_manager.next_song(self.guild_id):
-                    from commands.music import play_current_song
-                    await play_current_song(self.ctx)
+            from commands.music import get_player
+            get_player(self.ctx).post(SKIP)
             
             await interaction.response.send_message("⏭️ Skipped to next song", ephemeral=True)
             
@@ -175,8 +171,8 @@ class NowPlayingView(ui.View):
         """Handle stop button"""
         try:
             if self.ctx.voice_client and (self.ctx.voice_client.is_playing() or self.ctx.voice_client.is_paused()):
-                audio_manager.clear_queue(self.guild_id)
-                self.ctx.voice_client.stop()
+                from commands.music import get_player
+                get_player(self.ctx).post(STOP)
                 await interaction.response.send_message("⏹️ Stopped playback and cleared queue.", ephemeral=True)
             else:
                 await interaction.response.send_message("Nothing is playing.", ephemeral=True)
@@ -234,11 +230,18 @@ class QueueView(ui.View):
         if queue and 0 <= current_idx < len(queue):
             self.current_page = current_idx // self.per_page
         
+        self.refresh_page_count()
+    
+    def refresh_page_count(self):
+        """Recount pages - the queue can keep growing while a playlist streams in"""
+        queue = audio_manager.get_queue(self.guild_id)
         self.total_pages = max(0, (len(queue) - 1) // self.per_page)
+        self.current_page = min(self.current_page, self.total_pages)
     
     def update_buttons(self):
         """Update pagination buttons"""
         self.clear_items()
+        self.refresh_page_count()
         
         # Previous page button
         prev_button = ui.Button(
@@ -326,6 +329,7 @@ class QueueView(ui.View):
     
     async def next_page(self, interaction: discord.Interaction):
         """Go to next page"""
+        self.refresh_page_count()
         if self.current_page < self.total_pages:
             self.current_page += 1
             self.update_buttons()
@@ -355,6 +359,11 @@ class UIManager:
     
     def __init__(self):
         self.ui_messages: Dict[int, Dict[str, discord.Message]] = {}
+        # Latest ctx of guilds waiting for a redraw, and the task that will do it
+        self._redraw_ctx: Dict[int, Any] = {}
+        self._redraws: Dict[int, asyncio.Task] = {}
+        self.redraws = 0
+        self.redraws_coalesced = 0
     
     async def update_now_playing(self, ctx) -> Optional[discord.Message]:
         """Update or create now playing message"""
@@ -420,6 +429,35 @@ class UIManager:
         await self.update_now_playing(ctx)
         await self.update_queue(ctx)
     
+    def request_update(self, ctx, **_):
+        """Redraw the guild's UI shortly, folding any further requests into the same redraw
+        
+        Subscribed to the event bus's song_started and queue_changed events.
+        """
+        guild_id = ctx.guild.id
+        if guild_id in self._redraw_ctx:
+            self.redraws_coalesced += 1
+        self._redraw_ctx[guild_id] = ctx
+        
+        task = self._redraws.get(guild_id)
+        if task is None or task.done():
+            self._redraws[guild_id] = asyncio.get_running_loop().create_task(self._redraw(guild_id))
+    
+    async def _redraw(self, guild_id: int):
+        try:
+            # Requests arriving while a redraw is in flight get one more pass afterwards
+            while guild_id in self._redraw_ctx:
+                await asyncio.sleep(config.ui_redraw_delay)
+                ctx = self._redraw_ctx.pop(guild_id, None)
+                if ctx is None or not ctx.voice_client:
+                    continue
+                self.redraws += 1
+                await self.update_all_ui(ctx)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("ui_redraw", e, guild_id=guild_id)
+    
     async def update_now_playing_buttons(self, ctx, view: NowPlayingView):
         """Update only the buttons of the now playing message"""
         try:
@@ -446,6 +484,12 @@ class UIManager:
     
     async def cleanup_all_messages(self, guild_id: int):
         """Clean up all UI messages for a guild"""
+        # A pending redraw would just post them again
+        self._redraw_ctx.pop(guild_id, None)
+        task = self._redraws.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+        
         if guild_id in self.ui_messages:
             for message_type in list(self.ui_messages[guild_id].keys()):
                 await self._cleanup_message(guild_id, message_type)
@@ -0,0 +1,86 @@
+"""
+Internal event bus for Music Bot
+Lets playback announce what happened without waiting for stats, UI or other consumers
+"""
+import asyncio
+import inspect
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+from utils.logger import logger
+
+# Topics
+SONG_STARTED = 'song_started'  # payload: ctx, song
+QUEUE_CHANGED = 'queue_changed'  # payload: ctx
+
+
+class EventBus:
+    """In-process publish/subscribe on the event loop
+
+    publish() only queues the event; a single dispatcher task hands it to
+    the subscribers afterwards. Subscribers should be quick (buffer or
+    schedule work) since they share that dispatcher.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.failed = 0
+
+    def subscribe(self, topic: str, handler: Callable):
+        """Call handler(**payload) (sync or async) for every event on a topic"""
+        if handler not in self._subscribers[topic]:
+            self._subscribers[topic].append(handler)
+
+    def publish(self, topic: str, **payload):
+        """Queue an event for the topic's subscribers without waiting for them"""
+        if not self._subscribers.get(topic):
+            return
+        self.published += 1
+        self._events.put_nowait((topic, payload))
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            topic, payload = await self._events.get()
+            try:
+                for handler in list(self._subscribers.get(topic, ())):
+                    try:
+                        result = handler(**payload)
+                        if inspect.isawaitable(result):
+                            await result
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.failed += 1
+                        logger.error("event_bus_handler", e, event=topic)
+            finally:
+                self._events.task_done()
+
+    async def drain(self, timeout: float = 5.0):
+        """Wait until every queued event has been handed to its subscribers"""
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(self._events.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Event bus still had {self._events.qsize()} event(s) queued at shutdown")
+
+    def stop(self):
+        """Stop dispatching; queued events are dropped"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Dispatch counters"""
+        return {
+            'published': self.published,
+            'pending': self._events.qsize(),
+            'failed': self.failed,
+        }
+
+
+# Global event bus instance
+event_bus = EventBus()
@@ -7,7 +7,7 @@ import json
 import os
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from utils.logger import logger
 
@@ -39,12 +39,20 @@ class ServerStats:
 class StatsManager:
     """Manages song play statistics using JSON files"""
     
+    # Seconds song plays are buffered before being written in one batch
+    FLUSH_INTERVAL = 5
+    
     def __init__(self, stats_dir: str = "stats"):
         self.stats_dir = stats_dir
         self.plays_file = os.path.join(stats_dir, "song_plays.json")
         self.server_stats_file = os.path.join(stats_dir, "server_stats.json")
         self._ensure_stats_dir()
         self._lock = asyncio.Lock()
+        self._pending: List[SongPlay] = []
+        self._pending_names: Dict[int, str] = {}
+        # Plays already in the plays file whose server stats update failed
+        self._unfolded: List[SongPlay] = []
+        self._flush_task: Optional[asyncio.Task] = None
     
     def _ensure_stats_dir(self):
         """Create stats directory if it doesn't exist"""
@@ -52,73 +60,150 @@ class StatsManager:
             os.makedirs(self.stats_dir)
     
     async def record_song_play(self, guild_id: int, title: str, requester_id: int, duration: int = None, guild_name: str = None):
-        """Record a song play"""
+        """Record a song play and write it out right away"""
+        self.queue_song_play(guild_id, title, requester_id, duration, guild_name)
+        await self.flush()
+    
+    def queue_song_play(self, guild_id: int, title: str, requester_id: int, duration: int = None, guild_name: str = None):
+        """Buffer a song play; buffered plays are written together a few seconds later"""
+        self._pending.append(SongPlay(
+            title=title,
+            requester_id=requester_id,
+            guild_id=guild_id,
+            timestamp=datetime.now().isoformat(),
+            duration=duration
+        ))
+        if guild_name:
+            self._pending_names[guild_id] = guild_name
+        
+        self._schedule_flush()
+    
+    def on_song_started(self, ctx, song, **_):
+        """Event bus subscriber for song_started"""
+        self.queue_song_play(
+            guild_id=ctx.guild.id,
+            title=song.title,
+            requester_id=song.requester_id,
+            duration=song.duration,
+            guild_name=ctx.guild.name
+        )
+    
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+    
+    async def _flush_later(self):
+        await asyncio.sleep(self.FLUSH_INTERVAL)
+        self._flush_task = None  # A failed flush can schedule its own retry
+        await self.flush()
+    
+    async def flush(self):
+        """Write all buffered song plays with a single read/rewrite of each stats file
+        
+        The two files are written one after the other, so a failure only
+        re-queues the part that didn't make it: plays that never reached
+        the plays file, or plays already there that still need folding
+        into the server stats.
+        """
         async with self._lock:
+            plays, self._pending = self._pending, []
+            names, self._pending_names = self._pending_names, {}
+            unfolded, self._unfolded = self._unfolded, []
+            if not plays and not unfolded:
+                return
+            
+            # File I/O stays off the event loop
+            loop = asyncio.get_running_loop()
+            all_plays = None
+            if plays:
+                try:
+                    all_plays = await loop.run_in_executor(None, self._append_plays, plays)
+                except Exception as e:
+                    self._pending = plays + self._pending
+                    self._pending_names = {**names, **self._pending_names}
+                    self._unfolded = unfolded + self._unfolded
+                    logger.error("record_song_play", e)
+                    self._schedule_flush()
+                    return
+            
+            folded = unfolded + plays
             try:
-                # Create song play record
-                play = SongPlay(
-                    title=title,
-                    requester_id=requester_id,
-                    guild_id=guild_id,
-                    timestamp=datetime.now().isoformat(),
-                    duration=duration
-                )
-                
-                # Save to plays file
-                await self._append_song_play(play)
-                
-                # Update server stats
-                await self._update_server_stats(guild_id, title, guild_name)
-                
-                logger.info(f"Recorded song play: {title} in guild {guild_id} ({guild_name})")
-                
+                await loop.run_in_executor(None, self._update_server_stats, folded, names, all_plays)
+                logger.info(f"Recorded {len(folded)} song play(s)")
             except Exception as e:
-                logger.error("record_song_play", e, guild_id=guild_id)
+                self._unfolded = folded + self._unfolded
+                self._pending_names = {**names, **self._pending_names}
+                logger.error("record_song_play", e)
+                self._schedule_flush()
     
-    async def _append_song_play(self, play: SongPlay):
-        """Append song play to the plays file"""
-        plays = []
-        if os.path.exists(self.plays_file):
-            try:
-                with open(self.plays_file, 'r', encoding='utf-8') as f:
-                    plays = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                plays = []
-        
-        plays.append(asdict(play))
+    def _append_plays(self, plays: List[SongPlay]) -> List[Dict]:
+        """Append plays to the plays file; returns everything now in it"""
+        all_plays = self._load_json(self.plays_file, [])
+        all_plays.extend(asdict(play) for play in plays)
         
         # Keep only last 10000 plays to prevent file from growing too large
-        if len(plays) > 10000:
-            plays = plays[-10000:]
+        if len(all_plays) > 10000:
+            all_plays = all_plays[-10000:]
         
-        with open(self.plays_file, 'w', encoding='utf-8') as f:
-            json.dump(plays, f, indent=2, ensure_ascii=False)
+        self._write_json(self.plays_file, all_plays)
+        return all_plays
     
-    async def _update_server_stats(self, guild_id: int, title: str, guild_name: str = None):
-        """Update aggregated server statistics"""
-        server_stats = await self.get_server_stats(guild_id)
-        
-        # Update guild name if provided
-        if guild_name and guild_name != "Unknown Server":
-            server_stats.guild_name = guild_name
+    def _update_server_stats(self, plays: List[SongPlay], guild_names: Dict[int, str],
+                             all_plays: Optional[List[Dict]] = None):
+        """Fold plays already in the plays file into the server stats"""
+        if all_plays is None:
+            all_plays = self._load_json(self.plays_file, [])
+        all_stats = self._load_json(self.server_stats_file, {})
+        cutoff = datetime.now() - timedelta(hours=24)
+        now = datetime.now().isoformat()
         
-        # Update total plays
-        server_stats.total_plays += 1
-        
-        # Update most played
-        if title in server_stats.most_played:
-            server_stats.most_played[title] += 1
-        else:
-            server_stats.most_played[title] = 1
-        
-        # Update recent plays (last 24 hours)
-        server_stats.recent_plays = await self._count_recent_plays(guild_id)
-        
-        # Update timestamp
-        server_stats.last_updated = datetime.now().isoformat()
+        for guild_id in {play.guild_id for play in plays}:
+            stats_dict = all_stats.get(str(guild_id))
+            if stats_dict:
+                # Ensure guild_name exists for backwards compatibility
+                stats_dict.setdefault('guild_name', "Unknown Server")
+                server_stats = ServerStats(**stats_dict)
+            else:
+                server_stats = ServerStats(guild_id=guild_id)
+            
+            # Update guild name if provided
+            guild_name = guild_names.get(guild_id)
+            if guild_name and guild_name != "Unknown Server":
+                server_stats.guild_name = guild_name
+            
+            for play in plays:
+                if play.guild_id == guild_id:
+                    server_stats.total_plays += 1
+                    server_stats.most_played[play.title] = server_stats.most_played.get(play.title, 0) + 1
+            
+            # Update recent plays (last 24 hours)
+            server_stats.recent_plays = sum(
+                1 for play in all_plays
+                if play['guild_id'] == guild_id and datetime.fromisoformat(play['timestamp']) > cutoff
+            )
+            server_stats.last_updated = now
+            all_stats[str(guild_id)] = asdict(server_stats)
         
-        # Save updated stats
-        await self._save_server_stats(guild_id, server_stats)
+        self._write_json(self.server_stats_file, all_stats)
+    
+    @staticmethod
+    def _write_json(path: str, data):
+        """Write a stats file via a temp file, so a failed write leaves the old one intact"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _load_json(path: str, default):
+        """Read a stats file, falling back to an empty value if it is missing or corrupt"""
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, FileNotFoundError):
+                pass
+        return default
     
     async def get_server_stats(self, guild_id: int) -> ServerStats:
         """Get stats for a specific server"""
@@ -141,46 +226,6 @@ class StatsManager:
             logger.error("get_server_stats", e, guild_id=guild_id)
             return ServerStats(guild_id=guild_id)
     
-    async def _save_server_stats(self, guild_id: int, stats: ServerStats):
-        """Save server stats to file"""
-        try:
-            all_stats = {}
-            if os.path.exists(self.server_stats_file):
-                with open(self.server_stats_file, 'r', encoding='utf-8') as f:
-                    all_stats = json.load(f)
-            
-            all_stats[str(guild_id)] = asdict(stats)
-            
-            with open(self.server_stats_file, 'w', encoding='utf-8') as f:
-                json.dump(all_stats, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            logger.error("save_server_stats", e, guild_id=guild_id)
-    
-    async def _count_recent_plays(self, guild_id: int) -> int:
-        """Count plays in the last 24 hours for a server"""
-        try:
-            if not os.path.exists(self.plays_file):
-                return 0
-            
-            with open(self.plays_file, 'r', encoding='utf-8') as f:
-                plays = json.load(f)
-            
-            cutoff = datetime.now() - timedelta(hours=24)
-            recent_count = 0
-            
-            for play in plays:
-                if play['guild_id'] == guild_id:
-                    play_time = datetime.fromisoformat(play['timestamp'])
-                    if play_time > cutoff:
-                        recent_count += 1
-            
-            return recent_count
-            
-        except Exception as e:
-            logger.error("count_recent_plays", e, guild_id=guild_id)
-            return 0
-    
     async def get_all_servers(self) -> List[Dict]:
         """Get information about all servers"""
         try: